@@ -0,0 +1,333 @@
+import argparse
+import contextlib
+import functools
+import importlib.util
+import os
+import sys
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+
+from book_features import stored_mm_mid
+from data_cache import DATA_DIR, PRICE_LEVELS, DayData, load_day
+from datamodel import ArrayOrderDepth, CompactListing, CompactOrderDepth, CompactTrade, Listing, Observation, OrderDepth, Trade, TradingState, Symbol
+from fair_value import day_fair_values
+from order_matching import MarketTrade, OrderMatcher, apply_fills, book_arrays, build_book_levels
+
+# Configuration
+DEFAULT_ROUND = 1
+DEFAULT_DAYS = [-2, -1, 0]
+DEFAULT_LIMIT = 50
+DENOMINATION = "SEASHELLS"
+# Ticks per product where a precomputed fair value is also computed by the trader and must match exactly
+PRECOMPUTE_CHECK_TICKS = 200
+
+
+def load_trader_class(trader_file: str):
+    """Import a trader file as a fresh module and return its Trader class."""
+    trader_dir = os.path.dirname(os.path.abspath(trader_file))
+    if trader_dir not in sys.path:
+        sys.path.insert(0, trader_dir)
+
+    module_name = "_backtest_" + os.path.splitext(os.path.basename(trader_file))[0]
+    spec = importlib.util.spec_from_file_location(module_name, trader_file)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.Trader
+
+
+class PrecomputedFairValue:
+    """Stands in for a trader's calculate_dynamic_fair_value with whole-day series from fair_value.py.
+
+    Backtests replay a known day from an empty traderData, so the series is exact. The first
+    PRECOMPUTE_CHECK_TICKS lookups per product still run the trader's own method and raise if it
+    disagrees, so a strategy edit the vectorized series does not follow fails instead of scoring wrong.
+    """
+
+    def __init__(self, live, fair_values: Dict[Symbol, Tuple[List[float], List[float]]], row_index: Dict[Symbol, Dict[int, int]], check_ticks: int = PRECOMPUTE_CHECK_TICKS):
+        self.live = live  # The trader's bound calculate_dynamic_fair_value
+        self.fair_values = fair_values  # symbol -> (fair_value, mmmid) per price row, NaN where the trader returns None
+        self.row_index = row_index  # symbol -> timestamp -> price row
+        self.checks_left = {symbol: check_ticks for symbol in fair_values}
+        self.timestamp = None  # Set by the backtester before each Trader.run
+
+    def __call__(self, symbol: Symbol, book, traderObject: Dict) -> float | None:
+        series = self.fair_values.get(symbol)
+        row = self.row_index[symbol].get(self.timestamp) if series is not None else None
+        if row is None or series[0][row] != series[0][row]:  # NaN: no series value, let the trader decide
+            return self.live(symbol, book, traderObject)
+        expected = (series[0][row], series[1][row])
+        state_key = f"{symbol}_last_price"  # Where the trader keeps the mm mid between ticks
+        if self.checks_left[symbol] <= 0:
+            fair_value, traderObject[state_key] = expected
+            return fair_value
+
+        self.checks_left[symbol] -= 1
+        fair_value = self.live(symbol, book, traderObject)
+        if (fair_value, traderObject.get(state_key)) != expected:
+            raise ValueError(f"Precomputed fair value for {symbol} at {self.timestamp} is {expected}, the trader computes {(fair_value, traderObject.get(state_key))}")
+        return fair_value
+
+
+class _NullWriter:
+    """Swallows everything the trader prints (Logger.flush writes one line per tick)."""
+
+    def write(self, text: str) -> int:
+        return len(text)
+
+    def flush(self) -> None:
+        pass
+
+
+class BacktestResult:
+    """Outcome of replaying one day through a trader."""
+
+    def __init__(self, day: int, products: List[str], pnl_history: Dict[str, np.ndarray], own_trades: List[Trade], final_positions: Dict[str, int]):
+        self.day = day
+        self.products = products
+        self.pnl_history = pnl_history  # product -> mark-to-market PnL per timestamp
+        self.own_trades = own_trades
+        self.final_positions = final_positions
+
+    @property
+    def pnl(self) -> Dict[str, float]:
+        return {product: float(history[-1]) if len(history) else 0.0 for product, history in self.pnl_history.items()}
+
+    @property
+    def total_pnl(self) -> float:
+        return sum(self.pnl.values())
+
+
+class Backtester:
+    """Replays one day of market data through Trader.run in-process."""
+
+    def __init__(self, day_data: DayData, quiet: bool = True, products: List[str] = None, compact: bool = True, array_depths: bool = False, precompute_fair_values: bool = False):
+        self.data = day_data
+        self.quiet = quiet
+        # Swap the whole day's fair value series (fair_value.py) in for traders' tick by tick
+        # calculate_dynamic_fair_value; only the optimizer turns this on
+        self.precompute_fair_values = precompute_fair_values
+        # Slotted datamodel variants for everything the backtester builds; compact=False hands out the plain classes
+        self.compact = compact
+        self.trade_class = CompactTrade if compact else Trade
+        listing_class = CompactListing if compact else Listing
+        # array_depths: hand the trader ArrayOrderDepths that view the day's level matrices instead of fresh dicts
+        self.array_depths = array_depths
+        # Replaying a subset of products is only meaningful for traders that handle products independently
+        self.products = sorted(products) if products is not None else day_data.products
+        self.listings = {
+            product: listing_class(symbol=product, product=product, denomination=DENOMINATION)
+            for product in self.products
+        }
+        self._row_index = {
+            product: {int(ts): i for i, ts in enumerate(day_data.prices[product]["timestamp"])}
+            for product in self.products
+        }
+        self._book_levels = {
+            product: build_book_levels(day_data.prices[product], PRICE_LEVELS)
+            for product in self.products
+        }
+        self._depth_arrays = {
+            product: book_arrays(day_data.prices[product], PRICE_LEVELS)
+            for product in self.products
+        } if array_depths else {}
+        self._mid_prices = {
+            product: day_data.prices[product]["mid_price"].tolist()
+            for product in self.products
+        }
+        self._trade_rows = {
+            symbol: _group_rows_by_timestamp(cols["timestamp"])
+            for symbol, cols in day_data.trades.items()
+            if symbol in self._row_index
+        }
+
+    def run(self, trader) -> BacktestResult:
+        if not (self.precompute_fair_values and hasattr(trader, "calculate_dynamic_fair_value")):
+            return self._replay(trader, None)
+
+        # Shadow the method on this instance for this day only; the trader itself never knows about the series
+        shadowed = vars(trader).get("calculate_dynamic_fair_value")
+        precomputed = PrecomputedFairValue(trader.calculate_dynamic_fair_value, self._fair_values_for(trader), self._row_index)
+        trader.calculate_dynamic_fair_value = precomputed
+        try:
+            return self._replay(trader, precomputed)
+        finally:
+            # A trader run again on another day must not see this day's series
+            if shadowed is None:
+                del trader.calculate_dynamic_fair_value
+            else:
+                trader.calculate_dynamic_fair_value = shadowed
+
+    def _replay(self, trader, precomputed: PrecomputedFairValue | None) -> BacktestResult:
+        data = self.data
+        products = self.products
+        matcher = OrderMatcher(_position_limits(trader, products), trade_class=self.trade_class)
+
+        position: Dict[str, int] = {product: 0 for product in products}
+        cash: Dict[str, float] = {product: 0.0 for product in products}
+        pnl_history = {product: np.zeros(len(data.timestamps)) for product in products}
+        all_own_trades: List[Trade] = []
+
+        trader_data = ""
+        own_trades: Dict[Symbol, List[Trade]] = {product: [] for product in products}
+        market_trades: Dict[Symbol, List[Trade]] = {product: [] for product in products}
+        observations = Observation({}, {})
+
+        redirect = contextlib.redirect_stdout(_NullWriter()) if self.quiet else contextlib.nullcontext()
+        with redirect:
+            for tick, timestamp in enumerate(data.timestamps):
+                timestamp = int(timestamp)
+                order_depths = self._build_order_depths(timestamp)
+                if precomputed is not None:
+                    precomputed.timestamp = timestamp
+
+                state = TradingState(
+                    trader_data,
+                    timestamp,
+                    self.listings,
+                    order_depths,
+                    own_trades,
+                    market_trades,
+                    dict(position),
+                    observations,
+                )
+                orders, _conversions, trader_data = trader.run(state)
+                if trader_data is None:
+                    trader_data = ""
+
+                own_trades = {product: [] for product in products}
+                tick_trades = self._market_trades_at(timestamp)
+                for symbol, symbol_orders in (orders or {}).items():
+                    row = self._row_index.get(symbol, {}).get(timestamp)
+                    if row is None or not symbol_orders:
+                        continue
+                    fills = matcher.match(symbol, symbol_orders, self._book_levels[symbol][row], position[symbol], tick_trades.get(symbol, []), timestamp)
+                    if fills:
+                        position[symbol], cash[symbol] = apply_fills(fills, position[symbol], cash[symbol])
+                        own_trades[symbol] = fills
+                        all_own_trades.extend(fills)
+
+                # What the market traded this tick (minus what we took) shows up in the next state
+                market_trades = {
+                    product: [trade.to_trade(self.trade_class) for trade in tick_trades.get(product, []) if trade.quantity > 0]
+                    for product in products
+                }
+
+                for product in products:
+                    row = self._row_index[product].get(timestamp)
+                    if row is not None:
+                        pnl_history[product][tick] = cash[product] + position[product] * self._mid_prices[product][row]
+                    elif tick > 0:
+                        pnl_history[product][tick] = pnl_history[product][tick - 1]
+
+        return BacktestResult(data.day, products, pnl_history, all_own_trades, position)
+
+    def _fair_values_for(self, trader) -> Dict[Symbol, Tuple[List[float], List[float]]]:
+        """Day series, per price row, for every product the trader prices with adverse_volume/reversion_beta."""
+        fair_values = {}
+        for product in self.products:
+            params = getattr(trader, "PRODUCT_PARAMS", {}).get(product, {})
+            if "adverse_volume" in params and "reversion_beta" in params:
+                # The mm mid comes from the feature store when book_features.py already built it for this volume
+                mm_mid = stored_mm_mid(self.data, product, params["adverse_volume"])
+                fair_value, mmmid = day_fair_values(self.data, product, params["adverse_volume"], params["reversion_beta"], mm_mid)
+                fair_values[product] = (fair_value.tolist(), mmmid.tolist())
+        return fair_values
+
+    def _build_order_depths(self, timestamp: int) -> Dict[Symbol, OrderDepth]:
+        order_depths = {}
+        for product, rows in self._row_index.items():
+            row = rows.get(timestamp)
+            if row is None:
+                continue
+            if self.array_depths:
+                bid_prices, bid_volumes, ask_prices, ask_volumes, bid_counts, ask_counts = self._depth_arrays[product]
+                nb, na = bid_counts[row], ask_counts[row]
+                order_depths[product] = ArrayOrderDepth.from_arrays(bid_prices[row, :nb], bid_volumes[row, :nb], ask_prices[row, :na], ask_volumes[row, :na])
+                continue
+            book = self._book_levels[product][row]
+            if self.compact:
+                order_depths[product] = CompactOrderDepth(book.buy_orders(), book.sell_orders())
+                continue
+            order_depth = OrderDepth()
+            order_depth.buy_orders = book.buy_orders()
+            order_depth.sell_orders = book.sell_orders()
+            order_depths[product] = order_depth
+        return order_depths
+
+    def _market_trades_at(self, timestamp: int) -> Dict[Symbol, List[MarketTrade]]:
+        market_trades = {}
+        for symbol, rows in self._trade_rows.items():
+            span = rows.get(timestamp)
+            if span is None:
+                continue
+            start, end = span
+            cols = self.data.trades[symbol]
+            market_trades[symbol] = [
+                MarketTrade(symbol, int(cols["price"][i]), int(cols["quantity"][i]), str(cols["buyer"][i]), str(cols["seller"][i]), timestamp)
+                for i in range(start, end)
+            ]
+        return market_trades
+
+
+def _group_rows_by_timestamp(timestamps: np.ndarray) -> Dict[int, tuple]:
+    """Map each timestamp to the [start, end) row span it occupies in a timestamp-sorted column."""
+    if len(timestamps) == 0:
+        return {}
+    unique, starts = np.unique(timestamps, return_index=True)
+    ends = np.append(starts[1:], len(timestamps))
+    return {int(ts): (int(start), int(end)) for ts, start, end in zip(unique, starts, ends)}
+
+
+def _position_limits(trader, products: List[str]) -> Dict[str, int]:
+    params = getattr(trader, "PRODUCT_PARAMS", {}) or {}
+    return {product: int(params.get(product, {}).get("limit", DEFAULT_LIMIT)) for product in products}
+
+
+def run_backtest(trader_class, round_num: int = DEFAULT_ROUND, days: List[int] = DEFAULT_DAYS, data_dir: str = DATA_DIR, quiet: bool = True) -> List[BacktestResult]:
+    """Run a fresh Trader instance over each day and return one result per day."""
+    results = []
+    for day in days:
+        day_data = load_day(round_num, day, data_dir)
+        results.append(Backtester(day_data, quiet=quiet).run(trader_class()))
+    return results
+
+
+def merge_pnl(pnls: Iterable[Dict[str, float]]) -> Dict[str, float]:
+    """Sum final per-product PnL across days (or jobs), like prosperity3bt --merge-pnl."""
+    merged: Dict[str, float] = {}
+    for pnl in pnls:
+        for product, value in pnl.items():
+            merged[product] = merged.get(product, 0.0) + value
+    return merged
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay round data through a Trader in-process.")
+    parser.add_argument("trader_file", help="Path to the trader file, e.g. trader.py")
+    parser.add_argument("--round", type=int, default=DEFAULT_ROUND, dest="round_num")
+    parser.add_argument("--days", type=int, nargs="+", default=DEFAULT_DAYS)
+    parser.add_argument("--data-dir", default=DATA_DIR)
+    parser.add_argument("--params", default=None, help="JSON file of per-product overrides, e.g. optimized_params.json")
+    args = parser.parse_args()
+
+    trader_class = load_trader_class(args.trader_file)
+    if args.params is not None:
+        trader_class = functools.partial(trader_class, params_file=args.params)
+    results = run_backtest(trader_class, args.round_num, args.days, args.data_dir)
+
+    for result in results:
+        print(f"Round {args.round_num} day {result.day}:")
+        for product, pnl in result.pnl.items():
+            print(f"  {product}: {pnl:,.0f}")
+        print(f"  Total profit: {result.total_pnl:,.0f}")
+
+    merged = merge_pnl(result.pnl for result in results)
+    print("Profit summed across days:")
+    for product, pnl in merged.items():
+        print(f"  {product}: {pnl:,.0f}")
+    print(f"Final PnL: {sum(merged.values())}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+import argparse
+import json
+import os
+import shutil
+import tempfile
+from typing import Dict, List
+
+import numpy as np
+
+from data_cache import DATA_DIR, PRICE_LEVELS, DayData, available_days, cache_path, load_day, _map_table
+from fair_value import best_prices, mm_prices
+
+# Configuration
+FEATURES_DIRNAME = "features"
+FEATURES_VERSION = 1  # Bump when a feature definition changes so stored features are rebuilt
+ADVERSE_VOLUMES = [15]  # mm_mid_<v> is stored for each; 15 is the trader's adverse_volume
+
+
+def _levels(columns: Dict[str, np.ndarray], prefix: str):
+    prices = np.column_stack([columns[f"{prefix}_price_{level}"] for level in range(1, PRICE_LEVELS + 1)])
+    volumes = np.abs(np.column_stack([columns[f"{prefix}_volume_{level}"] for level in range(1, PRICE_LEVELS + 1)]))
+    # Missing levels count as zero volume so they drop out of every weighted sum
+    missing = np.isnan(prices) | np.isnan(volumes)
+    return np.where(missing, 0.0, prices), np.where(missing, 0.0, volumes)
+
+
+def compute_features(columns: Dict[str, np.ndarray], adverse_volumes: List[int] = ADVERSE_VOLUMES) -> Dict[str, np.ndarray]:
+    """Order-book features for every row of one product's day; NaN wherever a side is empty.
+
+    mid, spread           best bid/ask mid and width
+    microprice            L1 mid weighted toward the thinner side: (bid * ask_vol + ask * bid_vol) / (bid_vol + ask_vol)
+    weighted_mid          mean of the bid-side and ask-side volume-weighted prices over all levels
+    imbalance_l1/_l3      (bid volume - ask volume) / total, at the best level / over all levels
+    depth_fair_value      volume-weighted price of every resting level on both sides
+    mm_mid_<v>            mid of the best levels with at least v volume, as Trader.calculate_dynamic_fair_value uses
+    """
+    best_bid, best_ask = best_prices(columns)
+    bid_prices, bid_volumes = _levels(columns, "bid")
+    ask_prices, ask_volumes = _levels(columns, "ask")
+    # Volume sitting at the best price (levels are not assumed to be sorted)
+    best_bid_volume = np.where(bid_prices == best_bid[:, None], bid_volumes, 0.0).sum(axis=1)
+    best_ask_volume = np.where(ask_prices == best_ask[:, None], ask_volumes, 0.0).sum(axis=1)
+    bid_depth = bid_volumes.sum(axis=1)
+    ask_depth = ask_volumes.sum(axis=1)
+    bid_notional = (bid_prices * bid_volumes).sum(axis=1)
+    ask_notional = (ask_prices * ask_volumes).sum(axis=1)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        features = {
+            "mid": (best_bid + best_ask) / 2,
+            "spread": best_ask - best_bid,
+            "microprice": (best_bid * best_ask_volume + best_ask * best_bid_volume) / (best_bid_volume + best_ask_volume),
+            "weighted_mid": (bid_notional / bid_depth + ask_notional / ask_depth) / 2,
+            "imbalance_l1": (best_bid_volume - best_ask_volume) / (best_bid_volume + best_ask_volume),
+            "imbalance_l3": (bid_depth - ask_depth) / (bid_depth + ask_depth),
+            "depth_fair_value": (bid_notional + ask_notional) / (bid_depth + ask_depth),
+        }
+    one_sided = np.isnan(best_bid) | np.isnan(best_ask)
+    for values in features.values():
+        values[one_sided] = np.nan
+
+    for adverse_volume in adverse_volumes:
+        mm_bid, mm_ask = mm_prices(columns, adverse_volume)
+        features[f"mm_mid_{adverse_volume}"] = (mm_bid + mm_ask) / 2
+    return features
+
+
+def features_path(round_num: int, day: int, data_dir: str = DATA_DIR) -> str:
+    # Inside the day's column cache, so rebuilding the cache from new CSVs also drops stale features
+    return os.path.join(cache_path(round_num, day, data_dir), FEATURES_DIRNAME)
+
+
+def read_manifest(features_dir: str) -> Dict:
+    """The stored features' manifest, or None when it is missing, unreadable or from another FEATURES_VERSION."""
+    try:
+        with open(os.path.join(features_dir, "manifest.json")) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return manifest if manifest.get("version") == FEATURES_VERSION else None
+
+
+def build_features(round_num: int, day: int, data_dir: str = DATA_DIR, adverse_volumes: List[int] = ADVERSE_VOLUMES) -> str:
+    """Compute every product's features for a day and store them as .npy columns next to its prices.
+
+    mm_mid columns already stored for other adverse volumes are rebuilt too, so asking for a
+    new volume adds a column instead of replacing the set.
+    """
+    day_data = load_day(round_num, day, data_dir)
+    target = features_path(round_num, day, data_dir)
+    existing = read_manifest(target)
+    adverse_volumes = sorted(set(adverse_volumes) | set(existing["adverse_volumes"] if existing else []))
+    staging = tempfile.mkdtemp(prefix=FEATURES_DIRNAME + ".", dir=os.path.dirname(target))
+    for product in day_data.products:
+        product_dir = os.path.join(staging, product)
+        os.makedirs(product_dir)
+        for name, values in compute_features(day_data.prices[product], adverse_volumes).items():
+            np.save(os.path.join(product_dir, name + ".npy"), np.ascontiguousarray(values))
+
+    manifest = {"version": FEATURES_VERSION, "adverse_volumes": adverse_volumes, "products": day_data.products}
+    with open(os.path.join(staging, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=4)
+
+    if os.path.exists(target):
+        shutil.rmtree(target, ignore_errors=True)
+    try:
+        os.replace(staging, target)
+    except OSError:
+        # Another process published the same features first
+        shutil.rmtree(staging, ignore_errors=True)
+    return target
+
+
+def features_are_valid(round_num: int, day: int, data_dir: str = DATA_DIR, adverse_volumes: List[int] = ADVERSE_VOLUMES) -> bool:
+    manifest = read_manifest(features_path(round_num, day, data_dir))
+    return manifest is not None and set(adverse_volumes) <= set(manifest["adverse_volumes"])
+
+
+def stored_mm_mid(day_data: DayData, product: str, adverse_volume: float):
+    """The mm_mid_<adverse_volume> column already in the day's feature store, or None; never builds anything."""
+    if day_data.cache_dir is None or not float(adverse_volume).is_integer():
+        return None
+    features_dir = os.path.join(day_data.cache_dir, FEATURES_DIRNAME)
+    manifest = read_manifest(features_dir)
+    if manifest is None or int(adverse_volume) not in manifest["adverse_volumes"]:
+        return None
+    return np.load(os.path.join(features_dir, product, f"mm_mid_{int(adverse_volume)}.npy"), mmap_mode="r")
+
+
+def load_features(round_num: int, day: int, data_dir: str = DATA_DIR, adverse_volumes: List[int] = ADVERSE_VOLUMES, rebuild: bool = False) -> Dict[str, Dict[str, np.ndarray]]:
+    """product -> feature -> memory-mapped column, aligned row for row with load_day's price columns."""
+    # load_day first: a stale price cache gets rebuilt, which takes the old features with it
+    load_day(round_num, day, data_dir)
+    if rebuild or not features_are_valid(round_num, day, data_dir, adverse_volumes):
+        build_features(round_num, day, data_dir, adverse_volumes)
+
+    root = features_path(round_num, day, data_dir)
+    with open(os.path.join(root, "manifest.json")) as f:
+        manifest = json.load(f)
+    return {product: _map_table(os.path.join(root, product)) for product in manifest["products"]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute order-book features into the column cache.")
+    parser.add_argument("--round", type=int, default=1, dest="round_num")
+    parser.add_argument("--days", type=int, nargs="+", default=None)
+    parser.add_argument("--data-dir", default=DATA_DIR)
+    parser.add_argument("--adverse-volumes", type=int, nargs="+", default=ADVERSE_VOLUMES)
+    parser.add_argument("--force", action="store_true", help="Rebuild even if the features are up to date")
+    args = parser.parse_args()
+
+    days = args.days if args.days is not None else available_days(args.round_num, args.data_dir)
+    for day in days:
+        features = load_features(args.round_num, day, args.data_dir, args.adverse_volumes, rebuild=args.force)
+        for product, columns in features.items():
+            summary = ", ".join(f"{name} {np.nanmean(values):.2f}" for name, values in sorted(columns.items()))
+            print(f"Round {args.round_num} day {day} {product}: {summary}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,117 @@
+import json
+import math
+from collections import deque
 from datamodel import Listing, Observation, Order, OrderDepth, ProsperityEncoder, Symbol, Trade, TradingState
 from typing import List, Dict, Any
-import numpy as np
 from logger import Logger
 
+
+# Re-sum the window every this many full wraps so float drift in the running sums cannot build up
+RESYNC_WRAPS = 1024
+
+
+class RollingWindow:
+    """Fixed-size ring buffer of floats with O(1) mean/std/z-score and amortized O(1) min/max."""
+
+    def __init__(self, max_length: int) -> None:
+        self.max_length = max_length
+        self.buffer: List[float] = [0.0] * max_length
+        self.count = 0
+        self.pushed = 0  # Total values ever pushed; the next one lands at pushed % max_length
+        self.total = 0.0
+        self.total_sq = 0.0
+        # Monotonic deques of (push index, value): front is the current min / max
+        self._min = deque()
+        self._max = deque()
+
+    def __len__(self) -> int:
+        return self.count
+
+    def is_full(self) -> bool:
+        return self.count == self.max_length
+
+    def push(self, value: float) -> None:
+        slot = self.pushed % self.max_length
+        if self.count == self.max_length:
+            evicted = self.buffer[slot]
+            self.total -= evicted
+            self.total_sq -= evicted * evicted
+        else:
+            self.count += 1
+        self.buffer[slot] = value
+        self.total += value
+        self.total_sq += value * value
+        if slot == 0 and self.pushed and self.pushed % (self.max_length * RESYNC_WRAPS) == 0:
+            self.total = sum(self.buffer)
+            self.total_sq = sum(v * v for v in self.buffer)
+
+        index = self.pushed
+        self.pushed += 1
+        oldest = self.pushed - self.count
+        while self._min and self._min[-1][1] >= value:
+            self._min.pop()
+        self._min.append((index, value))
+        while self._min[0][0] < oldest:
+            self._min.popleft()
+        while self._max and self._max[-1][1] <= value:
+            self._max.pop()
+        self._max.append((index, value))
+        while self._max[0][0] < oldest:
+            self._max.popleft()
+
+    def last(self) -> float:
+        return self.buffer[(self.pushed - 1) % self.max_length]
+
+    def mean(self) -> float:
+        return self.total / self.count
+
+    def mean_excluding_last(self) -> float:
+        """Mean of every value but the newest, i.e. np.mean(values[:-1]); NaN when there is none."""
+        if self.count <= 1:
+            return float("nan")
+        return (self.total - self.last()) / (self.count - 1)
+
+    def variance(self) -> float:
+        mean = self.total / self.count
+        return max(self.total_sq / self.count - mean * mean, 0.0)
+
+    def std(self) -> float:
+        """Population standard deviation, like np.std."""
+        return math.sqrt(self.variance())
+
+    def zscore(self, value: float) -> float:
+        std = self.std()
+        return (value - self.mean()) / std if std > 0 else 0.0
+
+    def min(self) -> float:
+        return self._min[0][1]
+
+    def max(self) -> float:
+        return self._max[0][1]
+
+    def values(self) -> List[float]:
+        """Oldest to newest."""
+        start = self.pushed - self.count
+        return [self.buffer[i % self.max_length] for i in range(start, self.pushed)]
+
+    def to_state(self) -> list:
+        """Compact traderData form: [max_length, oldest, ..., newest]."""
+        return [self.max_length] + self.values()
+
+    @classmethod
+    def from_state(cls, state: list) -> "RollingWindow":
+        window = cls(int(state[0]))
+        for value in state[1:]:
+            window.push(value)
+        return window
+
+
 class TradeHistory:
     """Tracks trading history and market trends for a specific product."""
     
     def __init__(self, max_length: int = 10) -> None:
-        self.ask_list: List[float] = []
-        self.bid_list: List[float] = []
+        self.ask_window = RollingWindow(max_length)
+        self.bid_window = RollingWindow(max_length)
         self.max_length: int = max_length
         self.trade_state: str = "H"  # H: Hold, B: Buy, S: Sell
         self.buy_low: float = -1
@@ -17,15 +120,23 @@ class TradeHistory:
         self.current_ask: float = 0
         self.current_bid: float = 0
 
+    @property
+    def ask_list(self) -> List[float]:
+        return self.ask_window.values()
+
+    @property
+    def bid_list(self) -> List[float]:
+        return self.bid_window.values()
+
     def push_ask(self, ask: float) -> None:
         """Update ask history and check for trends."""
-        self._update_list(self.ask_list, ask)
+        self.ask_window.push(ask)
         self.current_ask = ask
         self._check_trends()
 
     def push_bid(self, bid: float) -> None:
         """Update bid history and check for trends."""
-        self._update_list(self.bid_list, bid)
+        self.bid_window.push(bid)
         self.current_bid = bid
         self._check_trends()
 
@@ -34,12 +145,6 @@ class TradeHistory:
         self.push_ask(ask)
         self.push_bid(bid)
 
-    def _update_list(self, lst: List[float], value: float) -> None:
-        """Maintain a rolling window of historical prices."""
-        if len(lst) == self.max_length:
-            lst.pop(0)
-        lst.append(value)
-
     def _check_trends(self) -> None:
         """Check for rising or falling market conditions."""
         self._is_falling()
@@ -47,8 +152,8 @@ class TradeHistory:
 
     def _is_falling(self) -> None:
         """Detect falling market conditions."""
-        if len(self.bid_list) == self.max_length:
-            avg_bid = np.mean(self.bid_list[:-1])
+        if self.bid_window.is_full():
+            avg_bid = self.bid_window.mean_excluding_last()
             if self.current_ask < avg_bid:
                 if self.trade_state == "H":
                     self.trade_state = "B"
@@ -58,8 +163,8 @@ class TradeHistory:
 
     def _is_rising(self) -> None:
         """Detect rising market conditions."""
-        if len(self.ask_list) == self.max_length:
-            avg_ask = np.mean(self.ask_list[:-1])
+        if self.ask_window.is_full():
+            avg_ask = self.ask_window.mean_excluding_last()
             if self.current_bid > avg_ask:
                 if self.trade_state == "H":
                     self.trade_state = "S"
@@ -71,6 +176,27 @@ class TradeHistory:
         """Update the current position."""
         self.position -= delta
 
+    def to_state(self) -> list:
+        """Compact form for traderData."""
+        return [self.ask_window.to_state(), self.bid_window.to_state(), self.trade_state, self.buy_low, self.sell_high, self.position]
+
+    @classmethod
+    def from_state(cls, state: list) -> "TradeHistory":
+        """Rebuild a history from to_state() output."""
+        ask_state, bid_state, trade_state, buy_low, sell_high, position = state
+        history = cls(int(ask_state[0]))
+        history.ask_window = RollingWindow.from_state(ask_state)
+        history.bid_window = RollingWindow.from_state(bid_state)
+        history.trade_state = trade_state
+        history.buy_low = buy_low
+        history.sell_high = sell_high
+        history.position = position
+        if len(history.ask_window):
+            history.current_ask = history.ask_window.last()
+        if len(history.bid_window):
+            history.current_bid = history.bid_window.last()
+        return history
+
 
 class Trader:
     """Main trading class implementing different strategies for different products."""
@@ -128,6 +254,10 @@ class Trader:
         if state.timestamp == 0:
             for symbol in state.order_depths:
                 self.history[symbol] = TradeHistory()
+        elif not self.history and state.traderData.startswith("{"):
+            # New Trader instance mid-day: restore the histories serialized last tick
+            for symbol, history_state in json.loads(state.traderData).items():
+                self.history[symbol] = TradeHistory.from_state(history_state)
 
         result = {}
         
@@ -161,6 +291,9 @@ class Trader:
                                    orders, symbol)
 
             result[symbol] = orders
-        self.logger.flush(state, result, 1, "SAMPLE")
-        return result, 1, "SAMPLE"
+
+        trader_data = json.dumps({symbol: history.to_state() for symbol, history in self.history.items()},
+                                 separators=(",", ":"))
+        self.logger.flush(state, result, 1, trader_data)
+        return result, 1, trader_data
     
\ No newline at end of file
@@ -0,0 +1,229 @@
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+# Configuration
+DATA_DIR = "round_1_data"
+CACHE_DIRNAME = "cache"
+CACHE_VERSION = 1
+PRICE_LEVELS = 3
+
+PRICE_COLUMNS = (
+    ["timestamp"]
+    + [f"{side}_{field}_{level}" for side in ("bid", "ask") for field in ("price", "volume") for level in range(1, PRICE_LEVELS + 1)]
+    + ["mid_price"]
+)
+TRADE_COLUMNS = ["timestamp", "price", "quantity", "buyer", "seller"]
+
+
+class DayData:
+    """Column arrays for one day of prices and market trades, split by product."""
+
+    def __init__(self, round_num: int, day: int, prices: Dict[str, Dict[str, np.ndarray]], trades: Dict[str, Dict[str, np.ndarray]], cache_dir: str = None):
+        self.round_num = round_num
+        self.day = day
+        self.cache_dir = cache_dir  # Column cache the arrays are mapped from, None when parsed straight from the CSVs
+        self.prices = prices  # product -> column name -> array (one row per timestamp)
+        self.trades = trades  # symbol -> column name -> array (one row per market trade)
+        self.products = sorted(prices.keys())
+        self.timestamps = np.unique(np.concatenate([cols["timestamp"] for cols in prices.values()]))
+
+
+def prices_path(round_num: int, day: int, data_dir: str = DATA_DIR) -> str:
+    return os.path.join(data_dir, f"prices_round_{round_num}_day_{day}.csv")
+
+
+def trades_path(round_num: int, day: int, data_dir: str = DATA_DIR) -> str:
+    return os.path.join(data_dir, f"trades_round_{round_num}_day_{day}.csv")
+
+
+def cache_path(round_num: int, day: int, data_dir: str = DATA_DIR) -> str:
+    return os.path.join(data_dir, CACHE_DIRNAME, f"round_{round_num}_day_{day}")
+
+
+def parse_day_csv(round_num: int, day: int, data_dir: str = DATA_DIR) -> DayData:
+    """Parse the prices/trades CSVs for one day into per-product column arrays."""
+    prices_df = pd.read_csv(prices_path(round_num, day, data_dir))
+    trades_df = pd.read_csv(trades_path(round_num, day, data_dir))
+
+    prices = {}
+    for product, group in prices_df.groupby("product", sort=True):
+        group = group.sort_values("timestamp", kind="stable")
+        columns = {}
+        for column in PRICE_COLUMNS:
+            # Missing book levels come through as NaN, keep them as float so they can be skipped
+            columns[column] = group[column].to_numpy(dtype=np.int64 if column == "timestamp" else np.float64)
+        prices[product] = columns
+
+    trades = {}
+    for symbol, group in trades_df.groupby("symbol", sort=True):
+        group = group.sort_values("timestamp", kind="stable")
+        trades[symbol] = {
+            "timestamp": group["timestamp"].to_numpy(dtype=np.int64),
+            "price": group["price"].to_numpy(dtype=np.float64),
+            "quantity": group["quantity"].to_numpy(dtype=np.int64),
+            "buyer": group["buyer"].fillna("").astype(str).to_numpy(dtype=np.str_),
+            "seller": group["seller"].fillna("").astype(str).to_numpy(dtype=np.str_),
+        }
+
+    return DayData(round_num, day, prices, trades)
+
+
+def _file_hash(path: str) -> str:
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _source_info(path: str, with_hash: bool = True) -> Dict:
+    stat = os.stat(path)
+    info = {"mtime": stat.st_mtime, "size": stat.st_size}
+    if with_hash:
+        info["sha1"] = _file_hash(path)
+    return info
+
+
+def build_cache(round_num: int, day: int, data_dir: str = DATA_DIR) -> str:
+    """Write one .npy file per column for every product of a day, plus a manifest of the source CSVs."""
+    sources = {
+        "prices": prices_path(round_num, day, data_dir),
+        "trades": trades_path(round_num, day, data_dir),
+    }
+    day_data = parse_day_csv(round_num, day, data_dir)
+
+    target = cache_path(round_num, day, data_dir)
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    # Build next to the target and swap it in so concurrent readers never see a half-written cache
+    staging = tempfile.mkdtemp(prefix=os.path.basename(target) + ".", dir=os.path.dirname(target))
+    for kind, tables in (("prices", day_data.prices), ("trades", day_data.trades)):
+        for name, columns in tables.items():
+            table_dir = os.path.join(staging, kind, name)
+            os.makedirs(table_dir)
+            for column, values in columns.items():
+                np.save(os.path.join(table_dir, column + ".npy"), np.ascontiguousarray(values))
+
+    manifest = {
+        "version": CACHE_VERSION,
+        "sources": {kind: _source_info(path) for kind, path in sources.items()},
+        "prices": sorted(day_data.prices),
+        "trades": sorted(day_data.trades),
+    }
+    with open(os.path.join(staging, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=4)
+
+    if os.path.exists(target):
+        shutil.rmtree(target, ignore_errors=True)
+    try:
+        os.replace(staging, target)
+    except OSError:
+        # Another process published the same cache first
+        shutil.rmtree(staging, ignore_errors=True)
+    return target
+
+
+def cache_is_valid(round_num: int, day: int, data_dir: str = DATA_DIR) -> bool:
+    """A cache is valid when both CSVs still match the manifest by mtime/size, or failing that by content hash."""
+    manifest_file = os.path.join(cache_path(round_num, day, data_dir), "manifest.json")
+    try:
+        with open(manifest_file) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return False
+    if manifest.get("version") != CACHE_VERSION:
+        return False
+
+    sources = {
+        "prices": prices_path(round_num, day, data_dir),
+        "trades": trades_path(round_num, day, data_dir),
+    }
+    touched = False
+    for kind, path in sources.items():
+        recorded = manifest["sources"].get(kind, {})
+        current = _source_info(path, with_hash=False)
+        if current["mtime"] == recorded.get("mtime") and current["size"] == recorded.get("size"):
+            continue
+        # mtime moved (checkout, copy) - only the content hash decides
+        if current["size"] != recorded.get("size") or _file_hash(path) != recorded.get("sha1"):
+            return False
+        recorded["mtime"] = current["mtime"]
+        touched = True
+
+    if touched:
+        try:
+            with open(manifest_file, "w") as f:
+                json.dump(manifest, f, indent=4)
+        except OSError:
+            pass
+    return True
+
+
+def _map_table(table_dir: str) -> Dict[str, np.ndarray]:
+    columns = {}
+    for filename in sorted(os.listdir(table_dir)):
+        if filename.endswith(".npy"):
+            # Read-only memory maps: every process loading the same day shares the page cache
+            columns[filename[:-4]] = np.load(os.path.join(table_dir, filename), mmap_mode="r")
+    return columns
+
+
+def load_day(round_num: int, day: int, data_dir: str = DATA_DIR, rebuild: bool = False) -> DayData:
+    """Memory-map a day's columns, converting the CSVs first if the cache is missing or stale."""
+    if rebuild or not cache_is_valid(round_num, day, data_dir):
+        build_cache(round_num, day, data_dir)
+
+    root = cache_path(round_num, day, data_dir)
+    with open(os.path.join(root, "manifest.json")) as f:
+        manifest = json.load(f)
+    prices = {product: _map_table(os.path.join(root, "prices", product)) for product in manifest["prices"]}
+    trades = {symbol: _map_table(os.path.join(root, "trades", symbol)) for symbol in manifest["trades"]}
+    return DayData(round_num, day, prices, trades, cache_dir=root)
+
+
+def data_hash(round_num: int, days: List[int], data_dir: str = DATA_DIR) -> str:
+    """Content hash of the CSVs behind a set of days, taken from their cache manifests."""
+    digest = hashlib.sha1()
+    for day in sorted(days):
+        if not cache_is_valid(round_num, day, data_dir):
+            build_cache(round_num, day, data_dir)
+        with open(os.path.join(cache_path(round_num, day, data_dir), "manifest.json")) as f:
+            sources = json.load(f)["sources"]
+        digest.update(f"{round_num}:{day}:{sources['prices']['sha1']}:{sources['trades']['sha1']};".encode())
+    return digest.hexdigest()
+
+
+def available_days(round_num: int, data_dir: str = DATA_DIR) -> List[int]:
+    prefix = f"prices_round_{round_num}_day_"
+    days = []
+    for filename in os.listdir(data_dir):
+        if filename.startswith(prefix) and filename.endswith(".csv"):
+            days.append(int(filename[len(prefix):-len(".csv")]))
+    return sorted(days)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert round CSVs into memory-mappable column files.")
+    parser.add_argument("--round", type=int, default=1, dest="round_num")
+    parser.add_argument("--days", type=int, nargs="+", default=None)
+    parser.add_argument("--data-dir", default=DATA_DIR)
+    parser.add_argument("--force", action="store_true", help="Rebuild even if the cache is up to date")
+    args = parser.parse_args()
+
+    days = args.days if args.days is not None else available_days(args.round_num, args.data_dir)
+    for day in days:
+        if args.force or not cache_is_valid(args.round_num, day, args.data_dir):
+            print(f"Building cache for round {args.round_num} day {day} -> {build_cache(args.round_num, day, args.data_dir)}")
+        else:
+            print(f"Cache for round {args.round_num} day {day} is up to date")
+
+
+if __name__ == "__main__":
+    main()
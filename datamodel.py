@@ -1,7 +1,9 @@
 import json
-from typing import Dict, List
+from collections.abc import Mapping, MutableMapping
+from typing import Any, Dict, Iterator, List
 from json import JSONEncoder
-import jsonpickle
+
+import numpy as np
 
 Time = int
 Symbol = str
@@ -38,9 +40,19 @@ class Observation:
         self.conversionObservations = conversionObservations
         
     def __str__(self) -> str:
-        return "(plainValueObservations: " + jsonpickle.encode(self.plainValueObservations) + ", conversionObservations: " + jsonpickle.encode(self.conversionObservations) + ")"
+        return "(plainValueObservations: " + json.dumps(self.plainValueObservations) + ", conversionObservations: " + _pickled_objects(self.conversionObservations) + ")"
      
 
+def _pickled_objects(objects: Dict[Product, Any]) -> str:
+    """The string jsonpickle.encode gives for a dict of model objects, without needing jsonpickle."""
+    items = []
+    for key, o in objects.items():
+        fields = json.dumps(object_fields(o))[1:-1]
+        tag = '{"py/object": "' + type(o).__module__ + "." + type(o).__qualname__ + '"'
+        items.append(json.dumps(str(key)) + ": " + tag + (", " + fields if fields else "") + "}")
+    return "{" + ", ".join(items) + "}"
+
+
 class Order:
 
     def __init__(self, symbol: Symbol, price: int, quantity: int) -> None:
@@ -79,6 +91,18 @@ class Trade:
         return "(" + self.symbol + ", " + self.buyer + " << " + self.seller + ", " + str(self.price) + ", " + str(self.quantity) + ", " + str(self.timestamp) + ")"
 
 
+def object_fields(o) -> dict:
+    """What json sees of a model object: its __dict__, or its slots in declaration order for the compact variants."""
+    if isinstance(o, ArrayOrderDepth):
+        return {"buy_orders": o.buy_orders.levels(), "sell_orders": o.sell_orders.levels()}
+    if isinstance(o, BookSideView):
+        return o.levels()  # A side on its own, as Logger emits them
+    try:
+        return o.__dict__
+    except AttributeError:
+        return {name: getattr(o, name) for name in o.__slots__}
+
+
 class TradingState(object):
 
     def __init__(self,
@@ -99,11 +123,298 @@ class TradingState(object):
         self.position = position
         self.observations = observations
         
-    def toJSON(self):
-        return json.dumps(self, default=lambda o: o.__dict__, sort_keys=True)
+    def toJSON(self, sort_keys: bool = True):
+        return state_to_json(self, sort_keys=sort_keys)
+
+    @staticmethod
+    def from_json(text: str, compact: bool = False) -> "TradingState":
+        return state_from_json(text, compact=compact)
+
+
+def state_to_json(state: TradingState, sort_keys: bool = False) -> str:
+    """TradingState as JSON built straight from the known fields, with one json.dumps and no callbacks.
+
+    With sort_keys=True the output is identical to json.dumps(state, default=object_fields, sort_keys=True);
+    without it keys keep constructor order.
+    """
+    listings = {}
+    for symbol, listing in state.listings.items():
+        if type(listing) == dict:
+            listings[symbol] = listing
+        else:
+            listings[symbol] = {"symbol": listing.symbol, "product": listing.product, "denomination": listing.denomination}
+
+    order_depths = {
+        symbol: {"buy_orders": _side_levels(order_depth.buy_orders), "sell_orders": _side_levels(order_depth.sell_orders)}
+        for symbol, order_depth in state.order_depths.items()
+    }
+
+    observations = state.observations
+    conversion_observations = {}
+    for product, o in observations.conversionObservations.items():
+        conversion_observations[product] = {
+            "bidPrice": o.bidPrice,
+            "askPrice": o.askPrice,
+            "transportFees": o.transportFees,
+            "exportTariff": o.exportTariff,
+            "importTariff": o.importTariff,
+            "sunlight": o.sunlight,
+            "humidity": o.humidity,
+        }
+
+    return json.dumps({
+        "traderData": state.traderData,
+        "timestamp": state.timestamp,
+        "listings": listings,
+        "order_depths": order_depths,
+        "own_trades": _trades_to_fields(state.own_trades),
+        "market_trades": _trades_to_fields(state.market_trades),
+        "position": state.position,
+        "observations": {
+            "plainValueObservations": observations.plainValueObservations,
+            "conversionObservations": conversion_observations,
+        },
+    }, sort_keys=sort_keys)
+
+
+def _side_levels(orders: Mapping) -> Dict[int, int]:
+    # Plain dicts go to json as they are; ArrayOrderDepth sides hand over their cached levels
+    return orders if type(orders) is dict else orders.levels()
+
+
+def _trades_to_fields(trades: Dict[Symbol, List[Trade]]) -> Dict[Symbol, List[Dict[str, Any]]]:
+    return {
+        symbol: [
+            {"symbol": t.symbol, "price": t.price, "quantity": t.quantity, "buyer": t.buyer, "seller": t.seller, "timestamp": t.timestamp}
+            for t in symbol_trades
+        ]
+        for symbol, symbol_trades in trades.items()
+    }
+
+
+def state_from_json(text: str, compact: bool = False) -> TradingState:
+    """Rebuild a TradingState from toJSON output; compact=True builds the slotted variants."""
+    listing_class = CompactListing if compact else Listing
+    order_depth_class = CompactOrderDepth if compact else OrderDepth
+    trade_class = CompactTrade if compact else Trade
+
+    data = json.loads(text)
+    listings = {
+        symbol: listing_class(listing["symbol"], listing["product"], listing["denomination"])
+        for symbol, listing in data["listings"].items()
+    }
+
+    order_depths = {}
+    for symbol, depth in data["order_depths"].items():
+        # JSON object keys are strings, prices go back to ints
+        order_depth = order_depth_class()
+        order_depth.buy_orders = {int(price): volume for price, volume in depth["buy_orders"].items()}
+        order_depth.sell_orders = {int(price): volume for price, volume in depth["sell_orders"].items()}
+        order_depths[symbol] = order_depth
+
+    def trades(raw: Dict[Symbol, List[Dict[str, Any]]]) -> Dict[Symbol, List[Trade]]:
+        return {
+            symbol: [trade_class(t["symbol"], t["price"], t["quantity"], t["buyer"], t["seller"], t["timestamp"]) for t in symbol_trades]
+            for symbol, symbol_trades in raw.items()
+        }
+
+    raw_observations = data["observations"]
+    observations = Observation(
+        raw_observations["plainValueObservations"],
+        {product: ConversionObservation(**fields) for product, fields in raw_observations["conversionObservations"].items()},
+    )
+
+    return TradingState(
+        data["traderData"],
+        data["timestamp"],
+        listings,
+        order_depths,
+        trades(data["own_trades"]),
+        trades(data["market_trades"]),
+        data["position"],
+        observations,
+    )
 
     
 class ProsperityEncoder(JSONEncoder):
 
         def default(self, o):
-            return o.__dict__
\ No newline at end of file
+            return object_fields(o)
+
+
+# Compact variants: same attribute names and output, but slotted so they carry no per-instance
+# __dict__. The backtester builds these by default; trader files keep importing the classes above.
+
+class CompactListing:
+    __slots__ = ("symbol", "product", "denomination")
+
+    def __init__(self, symbol: Symbol, product: Product, denomination: Product):
+        self.symbol = symbol
+        self.product = product
+        self.denomination = denomination
+
+
+class CompactOrderDepth:
+    __slots__ = ("buy_orders", "sell_orders")
+
+    def __init__(self, buy_orders: Dict[int, int] = None, sell_orders: Dict[int, int] = None):
+        # Passing the book straight in skips allocating two empty dicts that get replaced right away
+        self.buy_orders: Dict[int, int] = buy_orders if buy_orders is not None else {}
+        self.sell_orders: Dict[int, int] = sell_orders if sell_orders is not None else {}
+
+
+class CompactTrade:
+    __slots__ = ("symbol", "price", "quantity", "buyer", "seller", "timestamp")
+
+    def __init__(self, symbol: Symbol, price: int, quantity: int, buyer: UserId=None, seller: UserId=None, timestamp: int=0) -> None:
+        self.symbol = symbol
+        self.price: int = price
+        self.quantity: int = quantity
+        self.buyer = buyer
+        self.seller = seller
+        self.timestamp = timestamp
+
+    def __str__(self) -> str:
+        return "(" + self.symbol + ", " + self.buyer + " << " + self.seller + ", " + str(self.price) + ", " + str(self.quantity) + ", " + str(self.timestamp) + ")"
+
+    def __repr__(self) -> str:
+        return "(" + self.symbol + ", " + self.buyer + " << " + self.seller + ", " + str(self.price) + ", " + str(self.quantity) + ", " + str(self.timestamp) + ")"
+
+
+# Array-backed order depth: each side is a pair of small int64 buffers sorted best price first,
+# exposed through a dict-like view so Trader code written against OrderDepth keeps working.
+
+_EMPTY_LEVELS = np.zeros(0, dtype=np.int64)
+
+
+class BookSideView(MutableMapping):
+    """price -> volume over one side of an ArrayOrderDepth, iterated best price first.
+
+    Volumes are stored positive and exposed with the side's sign (sell volumes negative, as in
+    OrderDepth). Writes replace the buffers instead of touching them, so a side can safely be a
+    view into shared day arrays.
+    """
+
+    __slots__ = ("prices", "volumes", "descending", "sign", "_levels")
+
+    def __init__(self, prices: np.ndarray, volumes: np.ndarray, descending: bool):
+        self.prices = prices      # best first: descending for bids, ascending for asks
+        self.volumes = volumes    # positive
+        self.descending = descending
+        self.sign = 1 if descending else -1
+        self._levels = None  # Signed {price: volume}, built on the first dict-style lookup
+
+    @classmethod
+    def from_mapping(cls, orders: Mapping, descending: bool) -> "BookSideView":
+        levels = sorted(orders.items(), reverse=descending)
+        prices = np.array([price for price, _ in levels], dtype=np.int64)
+        volumes = np.array([abs(volume) for _, volume in levels], dtype=np.int64)
+        return cls(prices, volumes, descending)
+
+    def levels(self) -> Dict[int, int]:
+        if self._levels is None:
+            sign = self.sign
+            self._levels = {price: sign * volume for price, volume in zip(self.prices.tolist(), self.volumes.tolist())}
+        return self._levels
+
+    def __getitem__(self, price: int) -> int:
+        return self.levels()[price]
+
+    def __setitem__(self, price: int, volume: int) -> None:
+        matches = np.flatnonzero(self.prices == price)
+        if len(matches):
+            volumes = self.volumes.copy()
+            volumes[matches[0]] = abs(volume)
+            self.volumes = volumes
+        else:
+            key = -self.prices if self.descending else self.prices
+            i = int(np.searchsorted(key, -price if self.descending else price))
+            self.prices = np.insert(self.prices, i, price)
+            self.volumes = np.insert(self.volumes, i, abs(volume))
+        self._levels = None
+
+    def __delitem__(self, price: int) -> None:
+        matches = np.flatnonzero(self.prices == price)
+        if not len(matches):
+            raise KeyError(price)
+        self.prices = np.delete(self.prices, matches[0])
+        self.volumes = np.delete(self.volumes, matches[0])
+        self._levels = None
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.levels())
+
+    def __len__(self) -> int:
+        return len(self.prices)
+
+    def __contains__(self, price) -> bool:
+        return price in self.levels()
+
+    def keys(self):
+        return self.levels().keys()
+
+    def items(self):
+        return self.levels().items()
+
+    def values(self):
+        return self.levels().values()
+
+    def __repr__(self) -> str:
+        return repr(self.levels())
+
+    def best(self, min_volume: int = 0) -> int | None:
+        """Best price, or the best one with at least min_volume resting."""
+        if min_volume <= 0:
+            return int(self.prices[0]) if len(self.prices) else None
+        deep = np.flatnonzero(self.volumes >= min_volume)
+        return int(self.prices[deep[0]]) if len(deep) else None
+
+    def volume_at_or_better(self, price: int) -> int:
+        """Total (positive) volume priced at or better than price for this side."""
+        better = self.prices >= price if self.descending else self.prices <= price
+        return int(self.volumes[better].sum())
+
+
+class ArrayOrderDepth:
+    """OrderDepth whose sides are BookSideViews; buy_orders/sell_orders can still be assigned dicts."""
+
+    __slots__ = ("_buy_orders", "_sell_orders")
+
+    def __init__(self):
+        self._buy_orders = BookSideView(_EMPTY_LEVELS, _EMPTY_LEVELS, descending=True)
+        self._sell_orders = BookSideView(_EMPTY_LEVELS, _EMPTY_LEVELS, descending=False)
+
+    @classmethod
+    def from_arrays(cls, bid_prices: np.ndarray, bid_volumes: np.ndarray, ask_prices: np.ndarray, ask_volumes: np.ndarray) -> "ArrayOrderDepth":
+        """Wrap best-first int64 level arrays without copying; all volumes positive, like the price CSVs."""
+        order_depth = cls.__new__(cls)
+        order_depth._buy_orders = BookSideView(bid_prices, bid_volumes, descending=True)
+        order_depth._sell_orders = BookSideView(ask_prices, ask_volumes, descending=False)
+        return order_depth
+
+    @property
+    def buy_orders(self) -> BookSideView:
+        return self._buy_orders
+
+    @buy_orders.setter
+    def buy_orders(self, orders: Mapping) -> None:
+        self._buy_orders = BookSideView.from_mapping(orders, descending=True)
+
+    @property
+    def sell_orders(self) -> BookSideView:
+        return self._sell_orders
+
+    @sell_orders.setter
+    def sell_orders(self, orders: Mapping) -> None:
+        self._sell_orders = BookSideView.from_mapping(orders, descending=False)
+
+    def best_bid(self, min_volume: int = 0) -> int | None:
+        return self._buy_orders.best(min_volume)
+
+    def best_ask(self, min_volume: int = 0) -> int | None:
+        return self._sell_orders.best(min_volume)
+
+    def volume_at_or_better(self, price: int, is_buy: bool) -> int:
+        """Volume a buy (is_buy) or sell at price could take from the opposite side."""
+        side = self._sell_orders if is_buy else self._buy_orders
+        return side.volume_at_or_better(price)
@@ -0,0 +1,104 @@
+import hashlib
+import json
+import math
+import sqlite3
+from typing import Any, Dict, List
+
+# Configuration
+CACHE_FILE = "optimization_cache.sqlite"
+REAL_PRECISION = 4  # Real params closer than this cannot change behaviour meaningfully
+# Backtest engine files: a change to the simulator invalidates cached PnL just like a trader change.
+# Includes what the replay feeds the trader: the datamodel classes, the day cache and the fair value series
+ENGINE_FILES = ["backtester.py", "order_matching.py", "fair_value.py", "book_features.py", "datamodel.py", "data_cache.py"]
+
+
+def source_hash(paths: List[str]) -> str:
+    """Hash the trader file together with the simulator sources it is scored by."""
+    digest = hashlib.sha1()
+    for path in paths:
+        with open(path, "rb") as f:
+            digest.update(f.read())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def canonicalize_params(params: Dict[str, Any], base_params: Dict[str, Any]) -> Dict[str, Any]:
+    """Map params to a key that is equal whenever the trader would behave identically.
+
+    With an integer fair_value (RAINFOREST_RESIN) prices are integers, so take_width only
+    matters through ceil(take_width) and clear_width only through round(fair_value +/- width).
+    Everything else is rounded to REAL_PRECISION.
+    """
+    canonical = {}
+    fair_value = base_params.get("fair_value")
+    static_fair_value = isinstance(fair_value, int)
+    for name in sorted(params):
+        value = params[name]
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            canonical[name] = value
+        # The width rules come first so a whole-number width lands on the same key as its equivalents
+        elif static_fair_value and name == "take_width":
+            canonical[name] = math.ceil(value)
+        elif static_fair_value and name == "clear_width":
+            # Clearing sells at round(fv + w) and buys at round(fv - w)
+            canonical[name] = [round(fair_value + value) - fair_value, fair_value - round(fair_value - value)]
+        elif float(value).is_integer():
+            canonical[name] = int(value)
+        else:
+            canonical[name] = round(float(value), REAL_PRECISION)
+    return canonical
+
+
+class EvalCache:
+    """Persistent (source hash, data hash, product, canonical params) -> PnL store backed by SQLite."""
+
+    def __init__(self, trader_hash: str, data_hash: str, path: str = CACHE_FILE):
+        self.trader_hash = trader_hash
+        self.data_hash = data_hash
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS evaluations ("
+            " trader_hash TEXT NOT NULL,"
+            " data_hash TEXT NOT NULL,"
+            " product TEXT NOT NULL,"
+            " params TEXT NOT NULL,"
+            " pnl REAL NOT NULL,"
+            " PRIMARY KEY (trader_hash, data_hash, product, params))"
+        )
+        self.conn.commit()
+
+    def _key(self, product: str, canonical: Dict[str, Any]):
+        return (self.trader_hash, self.data_hash, product, json.dumps(canonical, sort_keys=True, separators=(",", ":")))
+
+    def get(self, product: str, canonical: Dict[str, Any]) -> float | None:
+        row = self.conn.execute(
+            "SELECT pnl FROM evaluations WHERE trader_hash = ? AND data_hash = ? AND product = ? AND params = ?",
+            self._key(product, canonical),
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return row[0]
+
+    def put(self, product: str, canonical: Dict[str, Any], pnl: float) -> None:
+        self.conn.execute(
+            "INSERT OR REPLACE INTO evaluations (trader_hash, data_hash, product, params, pnl) VALUES (?, ?, ?, ?, ?)",
+            self._key(product, canonical) + (float(pnl),),
+        )
+        self.conn.commit()
+
+    def report(self) -> str:
+        total = self.hits + self.misses
+        rate = 100.0 * self.hits / total if total else 0.0
+        return f"Cache: {self.hits} hits, {self.misses} misses ({rate:.0f}% hit rate)"
+
+    def reset_counters(self) -> None:
+        self.hits = 0
+        self.misses = 0
+
+    def close(self) -> None:
+        self.conn.close()
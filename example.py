@@ -1,33 +1,134 @@
 from datamodel import Listing, Observation, Order, OrderDepth, ProsperityEncoder, Symbol, Trade, TradingState
 from typing import List
 import string
-import numpy as np
 import json
+import math
+from collections import deque
 from typing import Any
 from logger import Logger
 
+# Re-sum the window every this many full wraps so float drift in the running sums cannot build up
+RESYNC_WRAPS = 1024
+
+
+class RollingWindow:
+    """Fixed-size ring buffer of floats with O(1) mean/std/z-score and amortized O(1) min/max."""
+
+    def __init__(self, max_length: int) -> None:
+        self.max_length = max_length
+        self.buffer: List[float] = [0.0] * max_length
+        self.count = 0
+        self.pushed = 0  # Total values ever pushed; the next one lands at pushed % max_length
+        self.total = 0.0
+        self.total_sq = 0.0
+        # Monotonic deques of (push index, value): front is the current min / max
+        self._min = deque()
+        self._max = deque()
+
+    def __len__(self) -> int:
+        return self.count
+
+    def is_full(self) -> bool:
+        return self.count == self.max_length
+
+    def push(self, value: float) -> None:
+        slot = self.pushed % self.max_length
+        if self.count == self.max_length:
+            evicted = self.buffer[slot]
+            self.total -= evicted
+            self.total_sq -= evicted * evicted
+        else:
+            self.count += 1
+        self.buffer[slot] = value
+        self.total += value
+        self.total_sq += value * value
+        if slot == 0 and self.pushed and self.pushed % (self.max_length * RESYNC_WRAPS) == 0:
+            self.total = sum(self.buffer)
+            self.total_sq = sum(v * v for v in self.buffer)
+
+        index = self.pushed
+        self.pushed += 1
+        oldest = self.pushed - self.count
+        while self._min and self._min[-1][1] >= value:
+            self._min.pop()
+        self._min.append((index, value))
+        while self._min[0][0] < oldest:
+            self._min.popleft()
+        while self._max and self._max[-1][1] <= value:
+            self._max.pop()
+        self._max.append((index, value))
+        while self._max[0][0] < oldest:
+            self._max.popleft()
+
+    def last(self) -> float:
+        return self.buffer[(self.pushed - 1) % self.max_length]
+
+    def mean(self) -> float:
+        return self.total / self.count
+
+    def mean_excluding_last(self) -> float:
+        """Mean of every value but the newest, i.e. np.mean(values[:-1]); NaN when there is none."""
+        if self.count <= 1:
+            return float("nan")
+        return (self.total - self.last()) / (self.count - 1)
+
+    def variance(self) -> float:
+        mean = self.total / self.count
+        return max(self.total_sq / self.count - mean * mean, 0.0)
+
+    def std(self) -> float:
+        """Population standard deviation, like np.std."""
+        return math.sqrt(self.variance())
+
+    def zscore(self, value: float) -> float:
+        std = self.std()
+        return (value - self.mean()) / std if std > 0 else 0.0
+
+    def min(self) -> float:
+        return self._min[0][1]
+
+    def max(self) -> float:
+        return self._max[0][1]
+
+    def values(self) -> List[float]:
+        """Oldest to newest."""
+        start = self.pushed - self.count
+        return [self.buffer[i % self.max_length] for i in range(start, self.pushed)]
+
+    def to_state(self) -> list:
+        """Compact traderData form: [max_length, oldest, ..., newest]."""
+        return [self.max_length] + self.values()
+
+    @classmethod
+    def from_state(cls, state: list) -> "RollingWindow":
+        window = cls(int(state[0]))
+        for value in state[1:]:
+            window.push(value)
+        return window
+
+
 class TradeHistory:
     def __init__(self, max_length=10):
-        self.ask_list=[]
-        self.bid_list=[]
+        self.ask_window=RollingWindow(max_length)
+        self.bid_window=RollingWindow(max_length)
         self.max_length=max_length
         self.trade_state="H"
         self.buy_low=-1
         self.sell_high=1e10
         self.position=0
+    @property
+    def ask_list(self):
+        return self.ask_window.values()
+    @property
+    def bid_list(self):
+        return self.bid_window.values()
     def push_ask(self, ask):
-        if len(self.ask_list)==self.max_length:
-            self.ask_list=self.ask_list[1:]+[ask]
-        else:
-            self.ask_list.append(ask)
+        self.ask_window.push(ask)
         self.current_ask=ask
         self.is_falling()
         self.is_rising()
     def push_bid(self, bid):
-        if len(self.bid_list)==self.max_length:
-            self.bid_list=self.bid_list[1:]+[bid]
-        else:
-            self.bid_list.append(bid)
+        self.bid_window.push(bid)
         self.current_bid=bid
         self.is_falling()
         self.is_rising()
@@ -35,9 +136,9 @@ class TradeHistory:
         self.push_ask(ask)
         self.push_bid(bid)
     def is_falling(self):
-        if len(self.bid_list)==self.max_length:
+        if self.bid_window.is_full():
             print("HIII")
-            avg_bid=np.mean(self.bid_list[:-1])
+            avg_bid=self.bid_window.mean_excluding_last()
             if self.current_ask<avg_bid:
                 if self.trade_state=="H":
                     self.trade_state="B"
@@ -47,8 +148,8 @@ class TradeHistory:
                 else:
                     pass
     def is_rising(self):
-        if len(self.ask_list)==self.max_length:
-            avg_ask=np.mean(self.ask_list[:-1])
+        if self.ask_window.is_full():
+            avg_ask=self.ask_window.mean_excluding_last()
             if self.current_bid>avg_ask:
                 if self.trade_state=="H":
                     self.trade_state="S"
@@ -59,6 +160,23 @@ class TradeHistory:
                     pass
     def add_pos(self, num):
         self.position-=num
+    def to_state(self):
+        return [self.ask_window.to_state(), self.bid_window.to_state(), self.trade_state, self.buy_low, self.sell_high, self.position]
+    @classmethod
+    def from_state(cls, state):
+        ask_state, bid_state, trade_state, buy_low, sell_high, position = state
+        history=cls(int(ask_state[0]))
+        history.ask_window=RollingWindow.from_state(ask_state)
+        history.bid_window=RollingWindow.from_state(bid_state)
+        history.trade_state=trade_state
+        history.buy_low=buy_low
+        history.sell_high=sell_high
+        history.position=position
+        if len(history.ask_window):
+            history.current_ask=history.ask_window.last()
+        if len(history.bid_window):
+            history.current_bid=history.bid_window.last()
+        return history
                   
 full_history={}
 
@@ -120,6 +238,10 @@ class Trader:
         if time==0:
             for symbol in state.order_depths:
                 full_history[symbol]=TradeHistory()
+        elif not full_history and state.traderData.startswith("{"):
+            # Fresh process mid-day: pick the histories back up from last tick's traderData
+            for symbol, history_state in json.loads(state.traderData).items():
+                full_history[symbol]=TradeHistory.from_state(history_state)
         for i, symbol in enumerate(state.order_depths):
             if symbol not in full_history:
                 full_history[symbol] = TradeHistory() 
@@ -145,7 +267,7 @@ class Trader:
     
 		    # String value holding Trader state data required. 
 				# It will be delivered as TradingState.traderData on next execution.
-        traderData = "SAMPLE" 
+        traderData = json.dumps({symbol: history.to_state() for symbol, history in full_history.items()}, separators=(",", ":"))
 				# Sample conversion request. Check more details below. 
         conversions = 1
         logger.flush(state, result, conversions, traderData)
@@ -0,0 +1,113 @@
+from collections import OrderedDict
+from typing import Dict, Tuple
+
+import numpy as np
+
+from data_cache import PRICE_LEVELS, DayData
+
+# Configuration
+MEMO_SIZE = 32  # Parameter-independent day arrays (best prices, mm mid per adverse_volume) kept per process
+
+
+def _side(columns: Dict[str, np.ndarray], prefix: str) -> Tuple[np.ndarray, np.ndarray]:
+    prices = np.column_stack([columns[f"{prefix}_price_{level}"] for level in range(1, PRICE_LEVELS + 1)])
+    volumes = np.column_stack([columns[f"{prefix}_volume_{level}"] for level in range(1, PRICE_LEVELS + 1)])
+    return prices, np.abs(volumes)
+
+
+def best_prices(columns: Dict[str, np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+    """Best bid/ask per row, NaN where that side of the book is empty."""
+    bid_prices, _ = _side(columns, "bid")
+    ask_prices, _ = _side(columns, "ask")
+    with np.errstate(invalid="ignore"):
+        return np.fmax.reduce(bid_prices, axis=1), np.fmin.reduce(ask_prices, axis=1)
+
+
+def mm_prices(columns: Dict[str, np.ndarray], adverse_volume: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Best bid/ask among levels with at least adverse_volume, NaN where no level qualifies."""
+    bid_prices, bid_volumes = _side(columns, "bid")
+    ask_prices, ask_volumes = _side(columns, "ask")
+    # NaN levels fail the comparison and drop out with the thin ones
+    with np.errstate(invalid="ignore"):
+        mm_bid = np.where(bid_volumes >= adverse_volume, bid_prices, -np.inf).max(axis=1)
+        mm_ask = np.where(ask_volumes >= adverse_volume, ask_prices, np.inf).min(axis=1)
+    mm_bid[np.isinf(mm_bid)] = np.nan
+    mm_ask[np.isinf(mm_ask)] = np.nan
+    return mm_bid, mm_ask
+
+
+def dynamic_fair_value_series(columns: Dict[str, np.ndarray], adverse_volume: float, reversion_beta: float, mm_mid: np.ndarray = None, best: Tuple[np.ndarray, np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """Vectorized Trader.calculate_dynamic_fair_value over a whole day of one product.
+
+    Returns (fair_value, mmmid) per row. Rows with an empty side get NaN for both, the
+    trader returns None there and leaves its stored last price untouched. mm_mid, when
+    given, is the mm mid column for adverse_volume and saves recomputing it; best is
+    best_prices(columns) when the caller already has it.
+    """
+    best_bid, best_ask = best if best is not None else best_prices(columns)
+    if mm_mid is None:
+        mm_bid, mm_ask = mm_prices(columns, adverse_volume)
+        mm_mid = (mm_ask + mm_bid) / 2
+    n = len(best_bid)
+    fair_value = np.full(n, np.nan)
+    mmmid = np.full(n, np.nan)
+
+    valid = ~np.isnan(best_bid) & ~np.isnan(best_ask)
+    rows = np.flatnonzero(valid)
+    if len(rows) == 0:
+        return fair_value, mmmid
+
+    mid = np.array(mm_mid[rows], dtype=np.float64)
+    # No qualifying level: fall back to the last stored price, or the plain mid before there is one
+    if np.isnan(mid[0]):
+        mid[0] = (best_ask[rows[0]] + best_bid[rows[0]]) / 2
+    filled = np.where(np.isnan(mid), 0, np.arange(len(mid)))
+    np.maximum.accumulate(filled, out=filled)
+    mid = mid[filled]
+
+    last = np.empty_like(mid)
+    last[0] = np.nan
+    last[1:] = mid[:-1]
+    fv = mid.copy()
+    reverting = ~np.isnan(last) & (last != 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # Same operation order as the trader so results match bit for bit
+        last_returns = (mid - last) / last
+        pred_returns = last_returns * reversion_beta
+        fv[reverting] = (mid + (mid * pred_returns))[reverting]
+
+    fair_value[rows] = fv
+    mmmid[rows] = mid
+    return fair_value, mmmid
+
+
+_MEMO: "OrderedDict[Tuple, object]" = OrderedDict()
+
+
+def _memoized(key: Tuple, compute):
+    value = _MEMO.get(key)
+    if value is not None:
+        _MEMO.move_to_end(key)
+        return value
+    value = _MEMO[key] = compute()
+    if len(_MEMO) > MEMO_SIZE:
+        _MEMO.popitem(last=False)
+    return value
+
+
+def day_fair_values(day_data: DayData, product: str, adverse_volume: float, reversion_beta: float, mm_mid: np.ndarray = None) -> Tuple[np.ndarray, np.ndarray]:
+    """(fair_value, mmmid) for one product/day, indexed like the day's price rows.
+
+    Only the parameter-independent inputs are memoized: the best prices per day and the mm mid
+    per adverse_volume. The series itself depends on the continuous reversion_beta, would
+    almost never repeat, and takes a single vectorized pass to build.
+    """
+    columns = day_data.prices[product]
+    day_key = (day_data.round_num, day_data.day, product)
+    best = _memoized(day_key + ("best",), lambda: best_prices(columns))
+    if mm_mid is None:
+        def compute_mm_mid():
+            mm_bid, mm_ask = mm_prices(columns, adverse_volume)
+            return (mm_ask + mm_bid) / 2
+        mm_mid = _memoized(day_key + ("mm_mid", float(adverse_volume)), compute_mm_mid)
+    return dynamic_fair_value_series(columns, adverse_volume, reversion_beta, mm_mid, best)
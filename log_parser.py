@@ -0,0 +1,227 @@
+import argparse
+import json
+import os
+from array import array
+from typing import Any, Dict, Iterator, List
+
+import numpy as np
+
+from data_cache import PRICE_COLUMNS, PRICE_LEVELS
+from logger import OrderDepthDecoder
+
+# Configuration
+# Column schemas: "q" int64, "d" float64, "U" string
+BOOK_SCHEMA = {column: "q" if column == "timestamp" else "d" for column in PRICE_COLUMNS}
+POSITION_SCHEMA = {"timestamp": "q", "position": "q"}
+TRADE_SCHEMA = {"timestamp": "q", "price": "d", "quantity": "q", "buyer": "U", "seller": "U", "logged_at": "q"}
+ORDER_SCHEMA = {"timestamp": "q", "price": "d", "quantity": "q"}
+TICK_SCHEMA = {"timestamp": "q", "conversions": "q", "log_length": "q"}
+
+
+class ColumnTable:
+    """Append-only columns kept as packed arrays (8 bytes a number) until converted to NumPy."""
+
+    def __init__(self, schema: Dict[str, str]):
+        self.schema = schema
+        self.columns = {name: [] if code == "U" else array(code) for name, code in schema.items()}
+        self.length = 0
+
+    def __len__(self) -> int:
+        return self.length
+
+    def append(self, *values) -> None:
+        for column, value in zip(self.columns.values(), values):
+            column.append(value)
+        self.length += 1
+
+    def to_numpy(self) -> Dict[str, np.ndarray]:
+        arrays = {}
+        for name, code in self.schema.items():
+            column = self.columns[name]
+            if code == "U":
+                arrays[name] = np.array(column, dtype=np.str_)
+            else:
+                arrays[name] = np.frombuffer(column, dtype=np.int64 if code == "q" else np.float64).copy()
+        return arrays
+
+
+class ParsedLog:
+    """Per-product column arrays decoded from Logger output."""
+
+    def __init__(self):
+        self.listings: Dict[str, List[Any]] = {}  # symbol -> [product, denomination]
+        self.ticks = ColumnTable(TICK_SCHEMA)
+        self.books: Dict[str, ColumnTable] = {}  # Same columns as the data_cache price tables
+        self.positions: Dict[str, ColumnTable] = {}
+        self.own_trades: Dict[str, ColumnTable] = {}
+        self.market_trades: Dict[str, ColumnTable] = {}
+        self.orders: Dict[str, ColumnTable] = {}
+
+    @staticmethod
+    def _table(tables: Dict[str, ColumnTable], key: str, schema: Dict[str, str]) -> ColumnTable:
+        table = tables.get(key)
+        if table is None:
+            table = tables[key] = ColumnTable(schema)
+        return table
+
+    def to_numpy(self) -> Dict[str, Any]:
+        """{"ticks": columns, "books": {product: columns}, ...} with every table as NumPy arrays."""
+        result = {"listings": dict(self.listings), "ticks": self.ticks.to_numpy()}
+        for name in ("books", "positions", "own_trades", "market_trades", "orders"):
+            result[name] = {key: table.to_numpy() for key, table in sorted(getattr(self, name).items())}
+        return result
+
+
+def flush_lines(path: str) -> Iterator[str]:
+    """Yield every Logger.flush line in a file, one at a time.
+
+    Understands raw trader stdout (one flush per line) as well as backtester and exchange
+    logs, where each flush sits in a "lambdaLog" string on its own line.
+    """
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line.startswith("[["):
+                yield line
+            elif line.startswith('"lambdaLog":'):
+                value = line[len('"lambdaLog":'):].strip().rstrip(",")
+                try:
+                    lambda_log = json.loads(value)
+                except ValueError:
+                    continue
+                for inner in lambda_log.splitlines():
+                    if inner.startswith("[["):
+                        yield inner
+
+
+class LogParser:
+    """Streams flush lines into a ParsedLog, holding one tick of Python objects at a time."""
+
+    def __init__(self):
+        self.result = ParsedLog()
+        self.decoder = OrderDepthDecoder()
+
+    def feed(self, line: str) -> bool:
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            return False  # Truncated or foreign line
+        if not self.well_formed(entry):
+            return False  # Valid JSON, but not a Logger.flush entry
+        state, orders, conversions, _, logs = entry
+        timestamp, _, listings, order_depths, own_trades, market_trades, position, _ = state
+        result = self.result
+
+        result.ticks.append(timestamp, int(conversions or 0), len(logs))
+        for symbol, product, denomination in listings:
+            result.listings[symbol] = [product, denomination]
+
+        books = self.decoder.decode(order_depths)
+        for symbol, (buy_orders, sell_orders) in (books or {}).items():
+            self._book_row(result._table(result.books, symbol, BOOK_SCHEMA), timestamp, buy_orders, sell_orders)
+
+        for symbol in set(result.listings) | set(position):
+            result._table(result.positions, symbol, POSITION_SCHEMA).append(timestamp, int(position.get(symbol, 0)))
+
+        for tables, trades in ((result.own_trades, own_trades), (result.market_trades, market_trades)):
+            for symbol, price, quantity, buyer, seller, trade_timestamp in trades:
+                result._table(tables, symbol, TRADE_SCHEMA).append(
+                    trade_timestamp, price, quantity, buyer or "", seller or "", timestamp
+                )
+
+        for symbol, price, quantity in orders:
+            result._table(result.orders, symbol, ORDER_SCHEMA).append(timestamp, price, quantity)
+        return True
+
+    @staticmethod
+    def well_formed(entry: Any) -> bool:
+        """Whether a decoded line has the shape Logger.flush writes, down to every row feed() unpacks."""
+        def rows(value: Any, width: int) -> bool:
+            return isinstance(value, list) and all(isinstance(row, list) and len(row) == width for row in value)
+
+        def depths(value: Any) -> bool:
+            # Keyframes are {symbol: [buy dict, sell dict]}, delta ticks [[buy changes, sell changes], ...]
+            # in the order of the last keyframe
+            if isinstance(value, list):
+                books = value
+                side_type = list
+            elif isinstance(value, dict):
+                books = value.values()
+                side_type = dict
+            else:
+                return False
+            return all(
+                isinstance(sides, list) and len(sides) == 2 and all(isinstance(side, side_type) for side in sides)
+                for sides in books
+            )
+
+        if not isinstance(entry, list) or len(entry) != 5:
+            return False
+        state, orders, conversions, _, logs = entry
+        if not isinstance(state, list) or len(state) != 8:
+            return False
+        timestamp, _, listings, order_depths, own_trades, market_trades, position, _ = state
+        return (
+            isinstance(timestamp, int)
+            and rows(listings, 3)
+            and depths(order_depths)
+            and rows(own_trades, 6)
+            and rows(market_trades, 6)
+            and isinstance(position, dict)
+            and rows(orders, 3)
+            and (conversions is None or isinstance(conversions, int))
+            and isinstance(logs, str)
+        )
+
+    @staticmethod
+    def _book_row(table: ColumnTable, timestamp: int, buy_orders: Dict[int, int], sell_orders: Dict[int, int]) -> None:
+        # Same layout as the price CSVs: best level first, ask volumes positive, NaN past the last level.
+        # Volume 0 levels are kept, the exchange book lists some (e.g. RAINFOREST_RESIN day -2)
+        bids = list(buy_orders.items())[:PRICE_LEVELS]
+        asks = list(sell_orders.items())[:PRICE_LEVELS]
+        nan = float("nan")
+        row = [timestamp]
+        for levels, sign in ((bids, 1), (asks, -1)):
+            row += [levels[i][0] if i < len(levels) else nan for i in range(PRICE_LEVELS)]
+            row += [sign * levels[i][1] if i < len(levels) else nan for i in range(PRICE_LEVELS)]
+        row.append((bids[0][0] + asks[0][0]) / 2 if bids and asks else nan)
+        table.append(*row)
+
+
+def parse_log(path: str) -> Dict[str, Any]:
+    """Parse a whole log file into NumPy columns, see ParsedLog.to_numpy."""
+    parser = LogParser()
+    for line in flush_lines(path):
+        parser.feed(line)
+    return parser.result.to_numpy()
+
+
+def save_columns(parsed: Dict[str, Any], out_dir: str) -> None:
+    """One .npz per table: ticks.npz, books_KELP.npz, own_trades_KELP.npz, ..."""
+    os.makedirs(out_dir, exist_ok=True)
+    np.savez(os.path.join(out_dir, "ticks.npz"), **parsed["ticks"])
+    with open(os.path.join(out_dir, "listings.json"), "w") as f:
+        json.dump(parsed["listings"], f, indent=4)
+    for name in ("books", "positions", "own_trades", "market_trades", "orders"):
+        for key, columns in parsed[name].items():
+            np.savez(os.path.join(out_dir, f"{name}_{key}.npz"), **columns)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Decode Logger output into per-product column arrays.")
+    parser.add_argument("log_file", help="Trader stdout, backtester log or exchange log")
+    parser.add_argument("--out", default=None, help="Directory to write the tables to as .npz files")
+    args = parser.parse_args()
+
+    parsed = parse_log(args.log_file)
+    print(f"{len(parsed['ticks']['timestamp'])} ticks")
+    for name in ("books", "positions", "own_trades", "market_trades", "orders"):
+        for key, columns in parsed[name].items():
+            print(f"  {name} {key}: {len(columns['timestamp'])} rows")
+    if args.out is not None:
+        save_columns(parsed, args.out)
+        print(f"Tables written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,42 +4,80 @@ from typing import Any
 from datamodel import Listing, Observation, Order, OrderDepth, ProsperityEncoder, Symbol, Trade, TradingState
 
 class Logger:
-    def __init__(self) -> None:
-        self.logs = ""
+    DEBUG = 10
+    INFO = 20
+    WARNING = 30
+
+    def __init__(
+        self,
+        level: int = INFO,
+        sample_every: int = 1,
+        enabled: bool = True,
+        delta_depths: bool = False,
+        keyframe_every: int = 100,
+    ) -> None:
+        self.log_parts: list[str] = []
+        self.log_length = 0
         self.max_log_length = 3750
+        # flush splits what is left after the state and orders between traderData in, traderData out
+        # and the logs, so the logs never get more than a third of the budget
+        self.max_logs_length = self.max_log_length // 3
+        self.level = level
+        self.sample_every = sample_every  # Only every n-th tick collects logs
+        self.enabled = enabled
+        self.ticks = 0
+        # Single gate checked first in print: enabled, sampled tick, and budget left
+        self.active = enabled
+        # Delta mode: between full books every keyframe_every ticks (so a reader can join mid-stream)
+        # only the levels that changed since the previous tick are sent
+        self.delta_depths = delta_depths
+        self.keyframe_every = keyframe_every
+        self.last_books: dict[Symbol, tuple[dict[int, int], dict[int, int]]] = {}
+        self.last_symbols: list[Symbol] = []
+
+    @property
+    def logs(self) -> str:
+        return "".join(self.log_parts)
 
-    def print(self, *objects: Any, sep: str = " ", end: str = "\n") -> None:
-        self.logs += sep.join(map(str, objects)) + end
+    def print(self, *objects: Any, sep: str = " ", end: str = "\n", level: int = INFO) -> None:
+        if not self.active:
+            return
+        if level < self.level:
+            return
+        piece = sep.join(map(str, objects)) + end
+        self.log_parts.append(piece)
+        self.log_length += len(piece)
+        if self.log_length >= self.max_logs_length:
+            # flush would cut everything printed from here on
+            self.active = False
+
+    def debug(self, *objects: Any, sep: str = " ", end: str = "\n") -> None:
+        self.print(*objects, sep=sep, end=end, level=self.DEBUG)
 
     def flush(self, state: TradingState, orders: dict[Symbol, list[Order]], conversions: int, trader_data: str) -> None:
-        base_length = len(
-            self.to_json(
-                [
-                    self.compress_state(state, ""),
-                    self.compress_orders(orders),
-                    conversions,
-                    "",
-                    "",
-                ]
-            )
-        )
+        # Everything but the three truncatable strings is encoded exactly once; those strings are
+        # spliced into the JSON afterwards, which gives the same bytes as encoding the whole list
+        compressed_state = self.compress_state(state, "")
+        timestamp_json = self.to_json(compressed_state[0])
+        state_rest_json = self.to_json(compressed_state[2:])[1:-1]
+        orders_json = self.to_json(self.compress_orders(orders))
+        conversions_json = self.to_json(conversions)
+
+        base_length = len(f'[[{timestamp_json},"",{state_rest_json}],{orders_json},{conversions_json},"",""]')
 
         # We truncate state.traderData, trader_data, and self.logs to the same max. length to fit the log limit
         max_item_length = (self.max_log_length - base_length) // 3
 
-        print(
-            self.to_json(
-                [
-                    self.compress_state(state, self.truncate(state.traderData, max_item_length)),
-                    self.compress_orders(orders),
-                    conversions,
-                    self.truncate(trader_data, max_item_length),
-                    self.truncate(self.logs, max_item_length),
-                ]
-            )
-        )
+        state_trader_data_json = self.to_json(self.truncate(state.traderData, max_item_length))
+        trader_data_json = self.to_json(self.truncate(trader_data, max_item_length))
+        logs_json = self.to_json(self.truncate(self.logs, max_item_length))
 
-        self.logs = ""
+        print(f"[[{timestamp_json},{state_trader_data_json},{state_rest_json}],{orders_json},{conversions_json},{trader_data_json},{logs_json}]")
+
+        self.log_parts = []
+        self.log_length = 0
+        self.ticks += 1
+        self.active = self.enabled and self.ticks % self.sample_every == 0
 
     def compress_state(self, state: TradingState, trader_data: str) -> list[Any]:
         return [
@@ -64,13 +102,70 @@ class Logger:
 
         return compressed
 
-    def compress_order_depths(self, order_depths: dict[Symbol, OrderDepth]) -> dict[Symbol, list[Any]]:
-        compressed = {}
+    def compress_order_depths(self, order_depths: dict[Symbol, OrderDepth]) -> dict[Symbol, list[Any]] | list[Any]:
+        if not self.delta_depths:
+            compressed = {}
+            for symbol, order_depth in order_depths.items():
+                compressed[symbol] = [order_depth.buy_orders, order_depth.sell_orders]
+
+            return compressed
+
+        # A changed set of symbols also starts a keyframe: delta ticks list books positionally
+        keyframe = self.ticks % self.keyframe_every == 0 or list(order_depths) != self.last_symbols
+        compressed = {} if keyframe else []
+        books = {}
         for symbol, order_depth in order_depths.items():
-            compressed[symbol] = [order_depth.buy_orders, order_depth.sell_orders]
+            buy_orders = dict(order_depth.buy_orders.items())
+            sell_orders = dict(order_depth.sell_orders.items())
+            if keyframe:
+                # Same shape as the non-delta output
+                compressed[symbol] = [buy_orders, sell_orders]
+            else:
+                # Prices are steps from the previous tick's best bid, so a one-tick move costs a couple of digits
+                previous_buy, previous_sell = self.last_books[symbol]
+                reference = max(previous_buy, default=0)
+                compressed.append([
+                    self.side_changes(previous_buy, buy_orders, reference, 1),
+                    self.side_changes(previous_sell, sell_orders, reference, -1),
+                ])
+            books[symbol] = (buy_orders, sell_orders)
+        self.last_books = books
+        self.last_symbols = list(order_depths)
 
         return compressed
 
+    def side_changes(self, previous: dict[int, int], levels: dict[int, int], reference: int, sign: int) -> list[Any]:
+        # Only the levels whose price or volume changed: [price step, volume or null to remove, ...],
+        # [] when nothing did. Volumes are sent as sign * volume so sell sizes lose their minus sign.
+        # When the whole side moved, resending it is shorter; that goes behind a leading null
+        changes = []
+        step_from = reference
+        for price in sorted(previous.keys() | levels.keys()):
+            if price in levels:
+                volume = levels[price]
+                if price in previous and previous[price] == volume:
+                    continue
+                volume *= sign
+            else:
+                volume = None
+            changes.append(price - step_from)
+            changes.append(volume)
+            step_from = price
+        if len(changes) < 2 * len(levels):
+            return changes
+
+        full = [None]
+        step_from = reference
+        for price, volume in levels.items():
+            full.append(price - step_from)
+            full.append(sign * volume)
+            step_from = price
+        return full if self.encoded_length(full) < self.encoded_length(changes) else changes
+
+    @staticmethod
+    def encoded_length(values: list[Any]) -> int:
+        return sum(4 if value is None else len(str(value)) for value in values) + len(values)
+
     def compress_trades(self, trades: dict[Symbol, list[Trade]]) -> list[list[Any]]:
         compressed = []
         for arr in trades.values():
@@ -121,4 +216,59 @@ class Logger:
         return value[: max_length - 3] + "..."
 
 
+class OrderDepthDecoder:
+    """Rebuilds full books from a stream of compressed order depths, delta-encoded or not.
+
+    Feed the order-depth entry of every logged tick in order; each call returns
+    {symbol: [buy_orders, sell_orders]} with int prices, bids best first and asks best first.
+    """
+
+    def __init__(self) -> None:
+        self.books: dict[Symbol, list[dict[int, int]]] = {}
+        self.synced = False  # Delta ticks before the first keyframe have no previous book to patch
+
+    def decode(self, compressed: dict[str, Any] | list[Any]) -> dict[Symbol, list[dict[int, int]]] | None:
+        if isinstance(compressed, dict):
+            self.books = {
+                symbol: [self.int_levels(buy), self.int_levels(sell)]
+                for symbol, (buy, sell) in compressed.items()
+            }
+            self.synced = True
+        elif not self.synced or len(compressed) != len(self.books):
+            return None
+        else:
+            # Delta ticks list the books positionally, in the order of the last keyframe
+            books = {}
+            for symbol, (buy_changes, sell_changes) in zip(self.books, compressed):
+                buy, sell = self.books[symbol]
+                reference = max(buy, default=0)
+                books[symbol] = [self.apply_changes(buy, buy_changes, reference, 1), self.apply_changes(sell, sell_changes, reference, -1)]
+            self.books = books
+        return self.snapshot()
+
+    def snapshot(self) -> dict[Symbol, list[dict[int, int]]]:
+        return {
+            symbol: [dict(sorted(buy.items(), reverse=True)), dict(sorted(sell.items()))]
+            for symbol, (buy, sell) in self.books.items()
+        }
+
+    @staticmethod
+    def apply_changes(levels: dict[int, int], changes: list[Any], reference: int, sign: int) -> dict[int, int]:
+        # See Logger.side_changes: a leading null resends the side, otherwise the pairs patch it
+        if changes and changes[0] is None:
+            levels, start = {}, 1
+        else:
+            levels, start = dict(levels), 0
+        price = reference
+        for i in range(start, len(changes), 2):
+            price += changes[i]
+            if changes[i + 1] is None:
+                del levels[price]
+            else:
+                levels[price] = sign * changes[i + 1]
+        return levels
 
+    @staticmethod
+    def int_levels(levels: dict[Any, int]) -> dict[int, int]:
+        # JSON object keys come back as strings, in the order they were logged
+        return {int(price): volume for price, volume in levels.items()}
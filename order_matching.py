@@ -0,0 +1,182 @@
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from datamodel import CompactTrade, Order, Trade, Symbol
+
+SUBMISSION = "SUBMISSION"
+
+# One side of the book at one tick: prices sorted best-first and their (positive) volumes
+BookSide = Tuple[List[int], List[int]]
+
+
+class BookLevels:
+    """Both sides of one product's book at one tick, best level first."""
+
+    __slots__ = ("bid_prices", "bid_volumes", "ask_prices", "ask_volumes")
+
+    def __init__(self, bid_prices: List[int], bid_volumes: List[int], ask_prices: List[int], ask_volumes: List[int]):
+        self.bid_prices = bid_prices    # descending
+        self.bid_volumes = bid_volumes  # positive
+        self.ask_prices = ask_prices    # ascending
+        self.ask_volumes = ask_volumes  # positive (OrderDepth stores them negative)
+
+    def buy_orders(self) -> Dict[int, int]:
+        return dict(zip(self.bid_prices, self.bid_volumes))
+
+    def sell_orders(self) -> Dict[int, int]:
+        return {price: -volume for price, volume in zip(self.ask_prices, self.ask_volumes)}
+
+
+def book_arrays(columns: Dict[str, np.ndarray], levels: int = 3) -> Tuple[np.ndarray, ...]:
+    """(bid_prices, bid_volumes, ask_prices, ask_volumes, bid_counts, ask_counts) for a whole day.
+
+    Each price/volume matrix is int64 of shape (rows, levels), best level first, with the row's
+    missing levels pushed past its count. All volumes are positive.
+    """
+    def side(prefix: str, descending: bool) -> Tuple[np.ndarray, np.ndarray]:
+        prices = np.column_stack([columns[f"{prefix}_price_{i}"] for i in range(1, levels + 1)])
+        volumes = np.column_stack([columns[f"{prefix}_volume_{i}"] for i in range(1, levels + 1)])
+        # Push missing levels to the back, then order the rest best-first
+        sort_key = np.where(np.isnan(prices), np.inf, -prices if descending else prices)
+        order = np.argsort(sort_key, axis=1, kind="stable")
+        return np.take_along_axis(prices, order, axis=1), np.take_along_axis(volumes, order, axis=1)
+
+    bid_prices, bid_volumes = side("bid", descending=True)
+    ask_prices, ask_volumes = side("ask", descending=False)
+    bid_counts = (~np.isnan(bid_prices)).sum(axis=1)
+    ask_counts = (~np.isnan(ask_prices)).sum(axis=1)
+    return (
+        np.nan_to_num(bid_prices).astype(np.int64),
+        np.nan_to_num(bid_volumes).astype(np.int64),
+        np.nan_to_num(ask_prices).astype(np.int64),
+        np.abs(np.nan_to_num(ask_volumes)).astype(np.int64),
+        bid_counts,
+        ask_counts,
+    )
+
+
+def build_book_levels(columns: Dict[str, np.ndarray], levels: int = 3) -> List[BookLevels]:
+    """Turn a product's level columns into one BookLevels per row, done once per day."""
+    bid_prices, bid_volumes, ask_prices, ask_volumes, bid_counts, ask_counts = (
+        array.tolist() for array in book_arrays(columns, levels)
+    )
+    return [
+        BookLevels(bid_prices[row][:nb], bid_volumes[row][:nb], ask_prices[row][:na], ask_volumes[row][:na])
+        for row, (nb, na) in enumerate(zip(bid_counts, ask_counts))
+    ]
+
+
+class MarketTrade:
+    """A market trade from the trades CSV whose quantity our resting orders can eat into."""
+
+    __slots__ = ("symbol", "price", "quantity", "buyer", "seller", "timestamp")
+
+    def __init__(self, symbol: Symbol, price: int, quantity: int, buyer: str, seller: str, timestamp: int):
+        self.symbol = symbol
+        self.price = price
+        self.quantity = quantity
+        self.buyer = buyer
+        self.seller = seller
+        self.timestamp = timestamp
+
+    def to_trade(self, trade_class: type = Trade) -> Trade:
+        return trade_class(self.symbol, self.price, self.quantity, self.buyer, self.seller, self.timestamp)
+
+
+class OrderMatcher:
+    """Fills a product's orders against the tick's book, then against that tick's market trades."""
+
+    def __init__(self, limits: Dict[Symbol, int], match_market_trades: bool = True, trade_class: type = CompactTrade):
+        self.limits = limits
+        self.match_market_trades = match_market_trades
+        self.trade_class = trade_class  # Fills are built as this (datamodel.Trade or CompactTrade)
+
+    def within_limits(self, symbol: Symbol, orders: List[Order], position: int) -> bool:
+        """The exchange cancels all of a product's orders if filling every buy (or every sell) would breach the limit."""
+        limit = self.limits[symbol]
+        total_buy = 0
+        total_sell = 0
+        for order in orders:
+            if order.quantity > 0:
+                total_buy += order.quantity
+            else:
+                total_sell -= order.quantity
+        return position + total_buy <= limit and position - total_sell >= -limit
+
+    def match(self, symbol: Symbol, orders: List[Order], book: BookLevels, position: int, market_trades: List[MarketTrade], timestamp: int) -> List[Trade]:
+        if not orders or not self.within_limits(symbol, orders, position):
+            return []
+
+        # Copy volumes only; prices stay shared with the precomputed day arrays
+        bid_prices = book.bid_prices
+        ask_prices = book.ask_prices
+        bid_volumes = list(book.bid_volumes)
+        ask_volumes = list(book.ask_volumes)
+        bid_start = 0
+        ask_start = 0
+
+        trade_class = self.trade_class
+        fills: List[Trade] = []
+        for order in orders:
+            quantity = order.quantity
+            if quantity > 0:
+                remaining = quantity
+                i = ask_start
+                while remaining > 0 and i < len(ask_prices) and ask_prices[i] <= order.price:
+                    volume = min(remaining, ask_volumes[i])
+                    if volume > 0:
+                        fills.append(trade_class(symbol, ask_prices[i], volume, SUBMISSION, "", timestamp))
+                        remaining -= volume
+                        ask_volumes[i] -= volume
+                    if ask_volumes[i] <= 0:  # Used up, or listed with volume 0 in the CSV
+                        i += 1
+                ask_start = i
+                if remaining > 0 and self.match_market_trades:
+                    remaining = self._fill_from_market(symbol, order.price, remaining, True, market_trades, fills, timestamp)
+            elif quantity < 0:
+                remaining = -quantity
+                i = bid_start
+                while remaining > 0 and i < len(bid_prices) and bid_prices[i] >= order.price:
+                    volume = min(remaining, bid_volumes[i])
+                    if volume > 0:
+                        fills.append(trade_class(symbol, bid_prices[i], volume, "", SUBMISSION, timestamp))
+                        remaining -= volume
+                        bid_volumes[i] -= volume
+                    if bid_volumes[i] <= 0:  # Used up, or listed with volume 0 in the CSV
+                        i += 1
+                bid_start = i
+                if remaining > 0 and self.match_market_trades:
+                    remaining = self._fill_from_market(symbol, order.price, remaining, False, market_trades, fills, timestamp)
+        return fills
+
+    def _fill_from_market(self, symbol: Symbol, price: int, remaining: int, is_buy: bool, market_trades: List[MarketTrade], fills: List[Trade], timestamp: int) -> int:
+        """A market trade at or through our resting price is assumed to have hit us first, filled at our price."""
+        trade_class = self.trade_class
+        for trade in market_trades:
+            if remaining == 0:
+                break
+            if trade.quantity == 0:
+                continue
+            if is_buy and trade.price > price or not is_buy and trade.price < price:
+                continue
+            volume = min(remaining, trade.quantity)
+            if is_buy:
+                fills.append(trade_class(symbol, price, volume, SUBMISSION, trade.seller, timestamp))
+            else:
+                fills.append(trade_class(symbol, price, volume, trade.buyer, SUBMISSION, timestamp))
+            trade.quantity -= volume
+            remaining -= volume
+        return remaining
+
+
+def apply_fills(fills: List[Trade], position: int, cash: float) -> Tuple[int, float]:
+    """Fold our fills into a product's position and cash."""
+    for fill in fills:
+        if fill.buyer == SUBMISSION:
+            position += fill.quantity
+            cash -= fill.price * fill.quantity
+        else:
+            position -= fill.quantity
+            cash += fill.price * fill.quantity
+    return position, cash
@@ -0,0 +1,155 @@
+import argparse
+import copy
+import inspect
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Tuple
+
+from backtester import DEFAULT_DAYS, DEFAULT_ROUND, Backtester, load_trader_class, merge_pnl
+from data_cache import DATA_DIR, load_day
+
+# Configuration
+PARALLEL_WORKERS = os.cpu_count() or 1
+
+# Per-worker state, filled in by _init_worker so every job reuses the loaded days
+_BACKTESTERS: Dict[Tuple, Backtester] = {}
+_TRADER_CLASSES: Dict[str, Tuple[float, type]] = {}
+_ROUND = DEFAULT_ROUND
+_DATA_DIR = DATA_DIR
+_PRECOMPUTE_FAIR_VALUES = False
+
+
+class BacktestJob:
+    """One unit of work: a trader file with a parameter overlay, replayed over one day (optionally some products)."""
+
+    def __init__(self, trader_file: str, day: int, params: Dict[str, Dict] = None, product: str | Tuple[str, ...] = None, params_file: str = None):
+        self.trader_file = os.path.abspath(trader_file)
+        self.day = day
+        self.params = params or {}
+        self.product = product  # None for every product, a product name, or a tuple of names
+        # Handed to Trader(params_file=...) the way backtester.py --params does; params apply on top
+        self.params_file = os.path.abspath(params_file) if params_file is not None else None
+
+
+def _init_worker(round_num: int, days: List[int], data_dir: str, precompute_fair_values: bool = False) -> None:
+    """Memory-map and index every day up front so jobs only pay for Trader.run."""
+    global _ROUND, _DATA_DIR, _PRECOMPUTE_FAIR_VALUES
+    _ROUND = round_num
+    _DATA_DIR = data_dir
+    _PRECOMPUTE_FAIR_VALUES = precompute_fair_values
+    for day in days:
+        _get_backtester(day, None)
+
+
+def _get_backtester(day: int, product: str | Tuple[str, ...]) -> Backtester:
+    key = (day, product)
+    if key not in _BACKTESTERS:
+        full = _BACKTESTERS.get((day, None))
+        day_data = full.data if full is not None else load_day(_ROUND, day, _DATA_DIR)
+        products = None if product is None else [product] if isinstance(product, str) else list(product)
+        _BACKTESTERS[key] = Backtester(day_data, products=products, precompute_fair_values=_PRECOMPUTE_FAIR_VALUES)
+    return _BACKTESTERS[key]
+
+
+def _get_trader_class(trader_file: str) -> type:
+    mtime = os.path.getmtime(trader_file)
+    cached = _TRADER_CLASSES.get(trader_file)
+    if cached is None or cached[0] != mtime:
+        cached = (mtime, load_trader_class(trader_file))
+        _TRADER_CLASSES[trader_file] = cached
+    return cached[1]
+
+
+def build_trader(trader_class: type, params: Dict[str, Dict], params_file: str = None):
+    """Instantiate a trader with per-product param overrides."""
+    kwargs = {"params_file": params_file} if params_file is not None else {}
+    if params and "params" in inspect.signature(trader_class.__init__).parameters:
+        return trader_class(params=params, **kwargs)
+
+    # Traders without a params argument get the overrides on a private copy of PRODUCT_PARAMS
+    trader = trader_class(**kwargs)
+    if params:
+        product_params = copy.deepcopy(getattr(trader, "PRODUCT_PARAMS", {}))
+        for product, overrides in params.items():
+            product_params.setdefault(product, {}).update(overrides)
+        trader.PRODUCT_PARAMS = product_params
+    return trader
+
+
+def _run_job(job: BacktestJob) -> Tuple[int, Dict[str, float]]:
+    trader = build_trader(_get_trader_class(job.trader_file), job.params, job.params_file)
+    result = _get_backtester(job.day, job.product).run(trader)
+    return job.day, result.pnl
+
+
+class ParallelBacktester:
+    """Fans (trader file, params, day) jobs out to a pool of workers that already hold the market data."""
+
+    def __init__(self, round_num: int = DEFAULT_ROUND, days: List[int] = DEFAULT_DAYS, max_workers: int = PARALLEL_WORKERS, data_dir: str = DATA_DIR, precompute_fair_values: bool = False):
+        self.round_num = round_num
+        self.days = list(days)
+        # Make sure the cache exists before workers race to build it
+        self.products = {day: load_day(round_num, day, data_dir).products for day in self.days}
+        self.executor = ProcessPoolExecutor(
+            max_workers=max_workers,
+            initializer=_init_worker,
+            initargs=(round_num, self.days, data_dir, precompute_fair_values),
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self) -> None:
+        self.executor.shutdown(wait=True)
+
+    def submit(self, job: BacktestJob):
+        return self.executor.submit(_run_job, job)
+
+    def run(self, trader_file: str, params: Dict[str, Dict] = None, split_products: List[str] = None, params_file: str = None) -> Tuple[Dict[str, float], List[Tuple[int, Dict[str, float]]]]:
+        """Evaluate a trader over every day at once; returns merged PnL and the per-day breakdown.
+
+        split_products runs each listed product in its own job and the remaining products together
+        in one more, which is only valid for traders whose products do not share state.
+        """
+        futures = []
+        for day in self.days:
+            jobs = [None]
+            if split_products:
+                rest = tuple(product for product in self.products[day] if product not in split_products)
+                jobs = list(split_products) + ([rest] if rest else [])
+            futures += [self.submit(BacktestJob(trader_file, day, params, product, params_file)) for product in jobs]
+        job_pnls = [future.result() for future in futures]
+        day_pnls = [(day, merge_pnl(pnl for job_day, pnl in job_pnls if job_day == day)) for day in self.days]
+        return merge_pnl(pnl for _day, pnl in day_pnls), day_pnls
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backtest a trader over several days in parallel.")
+    parser.add_argument("trader_file")
+    parser.add_argument("--round", type=int, default=DEFAULT_ROUND, dest="round_num")
+    parser.add_argument("--days", type=int, nargs="+", default=DEFAULT_DAYS)
+    parser.add_argument("--data-dir", default=DATA_DIR)
+    parser.add_argument("--params", default=None, help="JSON file of per-product overrides, e.g. optimized_params.json")
+    parser.add_argument("--workers", type=int, default=PARALLEL_WORKERS)
+    parser.add_argument("--split-products", nargs="+", default=None, help="Run each listed product in its own job, the other products together in one more")
+    args = parser.parse_args()
+
+    start = time.time()
+    with ParallelBacktester(args.round_num, args.days, args.workers, args.data_dir) as runner:
+        merged, day_pnls = runner.run(args.trader_file, split_products=args.split_products, params_file=args.params)
+
+    for day, pnl in day_pnls:
+        print(f"Round {args.round_num} day {day}: " + ", ".join(f"{product} {value:,.0f}" for product, value in pnl.items()))
+    print("Profit summed across days:")
+    for product, value in merged.items():
+        print(f"  {product}: {value:,.0f}")
+    print(f"Final PnL: {sum(merged.values())}")
+    print(f"Elapsed: {time.time() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
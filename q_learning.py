@@ -0,0 +1,217 @@
+import argparse
+import itertools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from data_cache import DATA_DIR, available_days, load_day
+
+# Configuration (same setup and defaults as lol.py)
+N_PRICE_BINS = 10
+N_ZSCORE_BINS = 5
+N_ACTIONS = 3  # 0 = Hold, 1 = Buy, 2 = Sell
+POSITION_SIZE = 50
+EPISODES = 100
+IDLE_PENALTY = -0.1
+SWEEP_WORKERS = os.cpu_count() or 1
+
+# Default sweep grid
+ALPHAS = [0.05, 0.1, 0.2]
+GAMMAS = [0.9, 0.95, 0.99]
+EPSILON_DECAYS = [0.99, 0.995, 0.999]
+
+
+class QConfig:
+    """Hyperparameters of one agent; a batch trains many of these side by side."""
+
+    def __init__(self, alpha: float = 0.1, gamma: float = 0.95, epsilon: float = 1.0, epsilon_decay: float = 0.995, min_epsilon: float = 0.01):
+        self.alpha = alpha
+        self.gamma = gamma
+        self.epsilon = epsilon
+        self.epsilon_decay = epsilon_decay
+        self.min_epsilon = min_epsilon
+
+    def to_dict(self) -> Dict[str, float]:
+        return {
+            "alpha": self.alpha,
+            "gamma": self.gamma,
+            "epsilon": self.epsilon,
+            "epsilon_decay": self.epsilon_decay,
+            "min_epsilon": self.min_epsilon,
+        }
+
+
+def indicators(prices) -> Tuple[np.ndarray, np.ndarray]:
+    """Velocity and 50-tick rolling z-score (0 where undefined), as lol.py computes them."""
+    velocity = np.diff(prices, prepend=prices[0])
+    rolling_mean = pd.Series(prices).rolling(50).mean()
+    rolling_std = pd.Series(prices).rolling(50).std()
+    zscore = (pd.Series(prices) - rolling_mean) / rolling_std
+    zscore = zscore.fillna(0).values  # Replace NaN with 0
+    return velocity, zscore
+
+
+class Episode:
+    """Everything about a price series that does not depend on the agent, computed once."""
+
+    def __init__(self, prices):
+        prices = np.asarray(prices, dtype=np.float64)
+        velocity, zscore = indicators(prices)
+        price_bins = np.linspace(prices.min(), prices.max(), N_PRICE_BINS)
+        zscore_bins = np.linspace(-3, 3, N_ZSCORE_BINS)
+
+        # lol.get_state for every tick at once; a -1 bin indexes the last bin there, so wrap it the same way
+        price_state = np.minimum(np.digitize(prices, price_bins) - 1, N_PRICE_BINS - 1) % N_PRICE_BINS
+        zscore_state = np.minimum(np.digitize(zscore, zscore_bins) - 1, N_ZSCORE_BINS - 1) % N_ZSCORE_BINS
+        self.prices = prices[1:].tolist()
+        self.states = (price_state * N_ZSCORE_BINS + zscore_state)[1:].tolist()
+        self.buy_signal = ((zscore < -1) & (velocity > 0))[1:].tolist()
+        self.sell_signal = ((zscore > 1) & (velocity < 0))[1:].tolist()
+
+    def __len__(self) -> int:
+        return len(self.prices)
+
+
+def train_batch(prices, configs: List[QConfig], episodes: int = EPISODES, seed: int = 42) -> Dict[str, np.ndarray]:
+    """Train one agent per config on the same series, episode by episode.
+
+    Same rules as lol.train, including the next state being the current one and the idle
+    penalty, but every config draws its own exploration noise from one numpy Generator, so
+    individual runs are not the same random stream as lol.py's np.random calls.
+    Returns reward_history/profit_history of shape (configs, episodes) and q_tables of
+    shape (configs, price bins, zscore bins, actions).
+    """
+    episode = Episode(prices)
+    rng = np.random.default_rng(seed)
+    n = len(configs)
+    alpha = np.array([c.alpha for c in configs])
+    gamma = np.array([c.gamma for c in configs])
+    epsilon = np.array([c.epsilon for c in configs])
+    epsilon_decay = np.array([c.epsilon_decay for c in configs])
+    min_epsilon = np.array([c.min_epsilon for c in configs])
+
+    # Plain Python per config inside an episode: numpy calls per tick cost more than the arithmetic they do
+    q = [[[0.0] * N_ACTIONS for _ in range(N_PRICE_BINS * N_ZSCORE_BINS)] for _ in range(n)]
+    reward_history = np.zeros((n, episodes))
+    profit_history = np.zeros((n, episodes))
+    ticks = list(zip(episode.prices, episode.states, episode.buy_signal, episode.sell_signal))
+
+    for ep in range(episodes):
+        # Drawn for every config at once, so the noise each run sees does not depend on the batch loop order
+        explore_all = (rng.random((len(episode), n)) < epsilon).T.tolist()
+        random_actions_all = rng.integers(0, N_ACTIONS, (len(episode), n)).T.tolist()
+
+        for j in range(n):
+            q_j = q[j]
+            a, g = float(alpha[j]), float(gamma[j])
+            inventory = 0
+            cash = 0.0
+            total_reward = 0.0
+            buy_price = 0.0
+
+            for (price, state, buy_signal, sell_signal), explore, random_action in zip(ticks, explore_all[j], random_actions_all[j]):
+                q_state = q_j[state]
+                holding = inventory > 0
+
+                # ε-greedy with the same indicator overrides as lol.py
+                if explore:
+                    action = random_action
+                elif holding and price - buy_price > 2:
+                    action = 0
+                elif buy_signal:
+                    action = 1
+                elif sell_signal and holding:
+                    action = 2
+                else:
+                    action = 0
+                    if q_state[1] > q_state[0]:
+                        action = 1
+                    if q_state[2] > q_state[action]:
+                        action = 2
+
+                # --- Trade Logic ---
+                if action == 1 and not holding:
+                    reward = 0.0
+                    inventory = POSITION_SIZE
+                    buy_price = price
+                elif action == 2 and holding:
+                    reward = (price - buy_price) * inventory
+                    cash += reward
+                    inventory = 0
+                else:
+                    reward = IDLE_PENALTY
+
+                # --- Q-Table Update (next state == state, as in lol.py) ---
+                old_value = q_state[action]
+                next_max = max(q_state)
+                q_state[action] = old_value + a * (reward + g * next_max - old_value)
+
+                total_reward += reward
+
+            reward_history[j, ep] = total_reward
+            profit_history[j, ep] = cash
+        epsilon = np.maximum(min_epsilon, epsilon * epsilon_decay)
+
+    q = np.array(q)
+    return {
+        "reward_history": reward_history,
+        "profit_history": profit_history,
+        "q_tables": q.reshape(n, N_PRICE_BINS, N_ZSCORE_BINS, N_ACTIONS),
+    }
+
+
+def _train_series(key: Tuple, prices: List[float], configs: List[QConfig], episodes: int, seed: int) -> Tuple[Tuple, Dict[str, np.ndarray]]:
+    return key, train_batch(prices, configs, episodes, seed)
+
+
+def sweep(series: Dict[Tuple, List[float]], configs: List[QConfig], episodes: int = EPISODES, seed: int = 42, max_workers: int = SWEEP_WORKERS) -> Dict[Tuple, Dict[str, np.ndarray]]:
+    """train_batch for every series (e.g. each (product, day)), one process per series."""
+    if max_workers <= 1 or len(series) <= 1:
+        return {key: train_batch(prices, configs, episodes, seed) for key, prices in series.items()}
+    with ProcessPoolExecutor(max_workers=min(max_workers, len(series))) as pool:
+        futures = [pool.submit(_train_series, key, prices, configs, episodes, seed) for key, prices in series.items()]
+        return dict(future.result() for future in futures)
+
+
+def grid(alphas: List[float] = ALPHAS, gammas: List[float] = GAMMAS, epsilon_decays: List[float] = EPSILON_DECAYS) -> List[QConfig]:
+    return [QConfig(alpha=a, gamma=g, epsilon_decay=d) for a, g, d in itertools.product(alphas, gammas, epsilon_decays)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep lol.py's Q-learning hyperparameters over every day in one batch.")
+    parser.add_argument("--product", default="SQUID_INK")
+    parser.add_argument("--round", type=int, default=1, dest="round_num")
+    parser.add_argument("--days", type=int, nargs="+", default=None)
+    parser.add_argument("--data-dir", default=DATA_DIR)
+    parser.add_argument("--episodes", type=int, default=EPISODES)
+    parser.add_argument("--alphas", type=float, nargs="+", default=ALPHAS)
+    parser.add_argument("--gammas", type=float, nargs="+", default=GAMMAS)
+    parser.add_argument("--epsilon-decays", type=float, nargs="+", default=EPSILON_DECAYS)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--workers", type=int, default=SWEEP_WORKERS)
+    args = parser.parse_args()
+
+    days = args.days if args.days is not None else available_days(args.round_num, args.data_dir)
+    series = {
+        (args.product, day): load_day(args.round_num, day, args.data_dir).prices[args.product]["mid_price"].tolist()
+        for day in days
+    }
+    configs = grid(args.alphas, args.gammas, args.epsilon_decays)
+
+    start = time.time()
+    results = sweep(series, configs, args.episodes, args.seed, args.workers)
+    print(f"Trained {len(configs)} configs x {len(series)} days x {args.episodes} episodes in {time.time() - start:.1f}s")
+
+    # Rank by final-episode profit summed over days
+    final_profit = sum(result["profit_history"][:, -1] for result in results.values())
+    for i in np.argsort(-final_profit)[:10]:
+        params = ", ".join(f"{name}={value}" for name, value in configs[i].to_dict().items())
+        print(f"  {final_profit[i]:>12,.2f}  {params}")
+
+
+if __name__ == "__main__":
+    main()
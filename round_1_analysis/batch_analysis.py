@@ -0,0 +1,164 @@
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Tuple
+
+ANALYSIS_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(ANALYSIS_DIR)
+sys.path.insert(0, REPO_ROOT)
+from data_cache import available_days, data_hash, load_day
+from eval_cache import source_hash
+from lag_correlation import DATA_DIR, ROUND
+
+# Configuration
+IMAGES_DIR = os.path.join(ANALYSIS_DIR, "images")
+MANIFEST_FILE = "batch_manifest.json"  # Input fingerprint of every rendered image, kept in IMAGES_DIR
+BATCH_WORKERS = os.cpu_count() or 1
+
+# name -> (module, function, price column, source files the figure depends on)
+ANALYSES: Dict[str, Tuple[str, str, str, List[str]]] = {
+    "delta_distribution": ("round_1_price_analysis", "delta_distribution", "bid_price_1", ["round_1_analysis/round_1_price_analysis.py"]),
+    "delta_heatmap": ("round_1_price_analysis", "delta_heatmap_half_integer", "bid_price_1", ["round_1_analysis/round_1_price_analysis.py", "round_1_analysis/delta_stats.py"]),
+    "conditional_mean_delta": ("round_1_price_analysis", "conditional_mean_delta_with_error", "bid_price_1", ["round_1_analysis/round_1_price_analysis.py", "round_1_analysis/delta_stats.py"]),
+    "first_difference_correlation": ("round_1_price_analysis", "first_difference_correlation", "bid_price_1", ["round_1_analysis/round_1_price_analysis.py", "round_1_analysis/lag_correlation.py"]),
+    "multiple_delta_correlations": ("round_1_price_analysis", "plot_multiple_delta_correlations", "bid_price_1", ["round_1_analysis/round_1_price_analysis.py", "round_1_analysis/lag_correlation.py"]),
+    "q_learning": ("lol", "render_training", "mid_price", ["lol.py", "q_learning.py"]),
+}
+
+
+class RenderJob:
+    """One figure: an analysis run on one product's column for one day."""
+
+    def __init__(self, analysis: str, round_num: int, day: int, product: str, out_dir: str = IMAGES_DIR):
+        self.analysis = analysis
+        self.round_num = round_num
+        self.day = day
+        self.product = product
+        self.path = os.path.join(out_dir, analysis, f"round_{round_num}_day_{day}_{product}.png")
+
+    def fingerprint(self, data_dir: str = DATA_DIR) -> str:
+        """Changes whenever the day's CSVs or the code drawing the figure change."""
+        module, function, column, sources = ANALYSES[self.analysis]
+        digest = hashlib.sha1()
+        digest.update(f"{self.analysis}:{function}:{column}:{self.product}:".encode())
+        digest.update(data_hash(self.round_num, [self.day], data_dir).encode())
+        digest.update(source_hash([os.path.join(REPO_ROOT, path) for path in sources]).encode())
+        return digest.hexdigest()
+
+
+def _render(job: RenderJob, data_dir: str) -> str:
+    """Draw one figure with the Agg backend and save it; plt.show() in the analysis is a no-op there."""
+    import importlib
+    import warnings
+
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    module, function, column, _ = ANALYSES[job.analysis]
+    analysis = getattr(importlib.import_module(module), function)
+    values = load_day(job.round_num, job.day, data_dir).prices[job.product][column].tolist()
+
+    plt.close("all")
+    with warnings.catch_warnings():
+        warnings.filterwarnings("ignore", message=".*non-interactive.*")
+        analysis(values)
+    os.makedirs(os.path.dirname(job.path), exist_ok=True)
+    # Write beside the target and rename so an interrupted run never leaves a half-written PNG
+    staging = job.path + ".tmp.png"
+    plt.gcf().savefig(staging, dpi=100)
+    plt.close("all")
+    os.replace(staging, job.path)
+    return job.path
+
+
+def load_manifest(out_dir: str = IMAGES_DIR) -> Dict[str, str]:
+    try:
+        with open(os.path.join(out_dir, MANIFEST_FILE)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_manifest(manifest: Dict[str, str], out_dir: str = IMAGES_DIR) -> None:
+    os.makedirs(out_dir, exist_ok=True)
+    path = os.path.join(out_dir, MANIFEST_FILE)
+    with open(path + ".tmp", "w") as f:
+        json.dump(manifest, f, indent=4, sort_keys=True)
+    os.replace(path + ".tmp", path)
+
+
+def plan_jobs(analyses: List[str], round_num: int, days: List[int], products: List[str], data_dir: str = DATA_DIR, out_dir: str = IMAGES_DIR) -> List[RenderJob]:
+    jobs = []
+    for day in days:
+        day_products = products if products is not None else load_day(round_num, day, data_dir).products
+        for product in day_products:
+            for analysis in analyses:
+                jobs.append(RenderJob(analysis, round_num, day, product, out_dir))
+    return jobs
+
+
+def run_batch(
+    analyses: List[str],
+    round_num: int = ROUND,
+    days: List[int] = None,
+    products: List[str] = None,
+    max_workers: int = BATCH_WORKERS,
+    force: bool = False,
+    data_dir: str = DATA_DIR,
+    out_dir: str = IMAGES_DIR,
+) -> Tuple[List[str], List[str]]:
+    """Render every (analysis, product, day) figure whose inputs changed; returns (rendered, skipped) paths."""
+    days = days if days is not None else available_days(round_num, data_dir)
+    manifest = load_manifest(out_dir)
+    pending, skipped = [], []
+    for job in plan_jobs(analyses, round_num, days, products, data_dir, out_dir):
+        key = os.path.relpath(job.path, out_dir)
+        fingerprint = job.fingerprint(data_dir)
+        if not force and manifest.get(key) == fingerprint and os.path.exists(job.path):
+            skipped.append(job.path)
+        else:
+            pending.append((job, key, fingerprint))
+
+    rendered = []
+    if pending:
+        with ProcessPoolExecutor(max_workers=min(max_workers, len(pending))) as pool:
+            futures = {pool.submit(_render, job, data_dir): (key, fingerprint) for job, key, fingerprint in pending}
+            for future in as_completed(futures):
+                key, fingerprint = futures[future]
+                try:
+                    rendered.append(future.result())
+                except Exception as e:
+                    print(f"Failed {key}: {e}")
+                    continue
+                manifest[key] = fingerprint
+                # Saved after every figure so an interrupted batch keeps what it finished
+                save_manifest(manifest, out_dir)
+    return rendered, skipped
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render analysis figures to PNG for every product and day, skipping ones that are up to date.")
+    parser.add_argument("--analyses", nargs="+", choices=sorted(ANALYSES), default=sorted(ANALYSES))
+    parser.add_argument("--round", type=int, default=ROUND, dest="round_num")
+    parser.add_argument("--days", type=int, nargs="+", default=None)
+    parser.add_argument("--products", nargs="+", default=None)
+    parser.add_argument("--workers", type=int, default=BATCH_WORKERS)
+    parser.add_argument("--data-dir", default=DATA_DIR)
+    parser.add_argument("--out", default=IMAGES_DIR)
+    parser.add_argument("--force", action="store_true", help="Re-render even if nothing changed")
+    args = parser.parse_args()
+
+    start = time.time()
+    rendered, skipped = run_batch(args.analyses, args.round_num, args.days, args.products, args.workers, args.force, args.data_dir, args.out)
+    for path in sorted(rendered):
+        print(f"Rendered {os.path.relpath(path)}")
+    print(f"{len(rendered)} rendered, {len(skipped)} up to date, {time.time() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
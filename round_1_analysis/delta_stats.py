@@ -0,0 +1,81 @@
+import os
+import sys
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from data_cache import available_days, load_day
+from lag_correlation import COLUMN, DATA_DIR, ROUND
+
+# Configuration
+# Half-integer buckets centred on -5.0 .. 5.0, the same bins the Δ[i] vs Δ[i+1] heatmap uses
+BIN_EDGES = np.arange(-5.25, 5.75, 0.5)
+
+
+def conditional_delta_stats(values, bin_edges: np.ndarray = BIN_EDGES) -> Dict[str, np.ndarray]:
+    """Statistics of the next move Δ[i+1] grouped by the current move Δ[i], in one pass.
+
+    Returns centers, count, mean, std (population, NaN for empty buckets) and transitions,
+    the (bucket of Δ[i], bucket of Δ[i+1]) counts that np.histogram2d gives with the same edges.
+    """
+    deltas = np.diff(np.asarray(values, dtype=np.float64))
+    x = deltas[:-1]
+    y = deltas[1:]
+    buckets = len(bin_edges) - 1
+
+    x_bins = _bin_index(x, bin_edges)
+    y_bins = _bin_index(y, bin_edges)
+    in_range = x_bins >= 0
+    xb = x_bins[in_range]
+    yv = y[in_range]
+
+    count = np.bincount(xb, minlength=buckets)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = np.bincount(xb, weights=yv, minlength=buckets) / count
+        # Second pass around each bucket's mean instead of E[y^2] - mean^2, which loses precision
+        std = np.sqrt(np.bincount(xb, weights=(yv - mean[xb]) ** 2, minlength=buckets) / count)
+
+    both = in_range & (y_bins >= 0)
+    transitions = np.bincount(x_bins[both] * buckets + y_bins[both], minlength=buckets * buckets)
+
+    return {
+        "centers": (bin_edges[:-1] + bin_edges[1:]) / 2,
+        "count": count,
+        "mean": mean,
+        "std": std,
+        "transitions": transitions.reshape(buckets, buckets).astype(np.float64),
+    }
+
+
+def _bin_index(values: np.ndarray, bin_edges: np.ndarray) -> np.ndarray:
+    """Bucket per value, -1 outside the edges; bins are [left, right) except the last, as in np.histogram."""
+    index = np.digitize(values, bin_edges) - 1
+    index[values == bin_edges[-1]] = len(bin_edges) - 2
+    index[(index < 0) | (index >= len(bin_edges) - 1)] = -1
+    return index
+
+
+def day_delta_stats(
+    round_num: int = ROUND,
+    days: List[int] = None,
+    products: List[str] = None,
+    column: str = COLUMN,
+    bin_edges: np.ndarray = BIN_EDGES,
+    data_dir: str = DATA_DIR,
+) -> Dict[Tuple[str, int], Dict[str, np.ndarray]]:
+    """conditional_delta_stats for every (product, day) of a round, straight from the memory-mapped columns."""
+    days = days if days is not None else available_days(round_num, data_dir)
+    results = {}
+    for day in days:
+        day_data = load_day(round_num, day, data_dir)
+        for product in products if products is not None else day_data.products:
+            results[(product, day)] = conditional_delta_stats(day_data.prices[product][column], bin_edges)
+    return results
+
+
+if __name__ == "__main__":
+    for (product, day), stats in day_delta_stats().items():
+        seen = stats["count"] > 0
+        reverting = np.corrcoef(stats["centers"][seen], stats["mean"][seen])[0, 1] if seen.sum() > 1 else np.nan
+        print(f"{product} day {day}: {int(stats['count'].sum())} moves in range, corr(Δ[i], E[Δ[i+1]]) {reverting:.3f}")
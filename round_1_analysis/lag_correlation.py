@@ -0,0 +1,108 @@
+import os
+import sys
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+from data_cache import available_days, load_day
+
+# Configuration
+DATA_DIR = os.path.join(REPO_ROOT, "round_1_data")
+ROUND = 1
+COLUMN = "bid_price_1"
+MAX_J = 100
+DELTA_TS = range(1, 21)
+
+
+def lag_correlations(values, max_j: int = MAX_J, delta_ts: Iterable[int] = DELTA_TS) -> np.ndarray:
+    """Correlation of (values[i + dt] - values[i]) with (values[i + j + dt] - values[i + j]).
+
+    Returns a (len(delta_ts), max_j) array, row per delta_t and column per lag j = 1..max_j,
+    with the same segments and NaNs as np.corrcoef on the two Python lists built per (dt, j)
+    in round_1_price_analysis. values must not contain NaN.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    delta_ts = list(delta_ts)
+    result = np.full((len(delta_ts), max_j), np.nan)
+    for row, delta_t in enumerate(delta_ts):
+        result[row] = _difference_autocorrelation(values[delta_t:] - values[:-delta_t], max_j)
+    return result
+
+
+def _difference_autocorrelation(d: np.ndarray, max_j: int) -> np.ndarray:
+    """Pearson correlation of d[:m - j] with d[j:] for every j = 1..max_j, in O(m log m)."""
+    m = len(d)
+    correlations = np.full(max_j, np.nan)
+    lags = np.arange(1, min(max_j, m - 2) + 1)  # np.corrcoef needs at least two pairs
+    if len(lags) == 0:
+        return correlations
+
+    # Pearson is shift-invariant; centring first keeps the running sums from cancelling out
+    d = d - d.mean()
+    size = 1 << (2 * m - 1).bit_length()
+    spectrum = np.fft.rfft(d, size)
+    cross = np.fft.irfft(spectrum * np.conj(spectrum), size)[lags]  # sum_i d[i] * d[i + j]
+
+    prefix = np.concatenate(([0.0], np.cumsum(d)))
+    prefix_sq = np.concatenate(([0.0], np.cumsum(d * d)))
+    count = m - lags
+    sum_x = prefix[m - lags]
+    sum_y = prefix[m] - prefix[lags]
+    sum_xx = prefix_sq[m - lags]
+    sum_yy = prefix_sq[m] - prefix_sq[lags]
+
+    cov = cross - sum_x * sum_y / count
+    var_x = sum_xx - sum_x * sum_x / count
+    var_y = sum_yy - sum_y * sum_y / count
+    # A constant segment has no correlation, like np.corrcoef; its variance only survives as rounding noise
+    varying = (var_x > 1e-10 * sum_xx) & (var_y > 1e-10 * sum_yy)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        correlations[lags - 1] = np.where(varying, cov / np.sqrt(var_x * var_y), np.nan)
+    return correlations
+
+
+def day_lag_correlations(
+    round_num: int = ROUND,
+    days: List[int] = None,
+    products: List[str] = None,
+    column: str = COLUMN,
+    max_j: int = MAX_J,
+    delta_ts: Iterable[int] = DELTA_TS,
+    data_dir: str = DATA_DIR,
+) -> Dict[Tuple[str, int], np.ndarray]:
+    """lag_correlations for every (product, day) of a round, read from the memory-mapped day cache."""
+    days = days if days is not None else available_days(round_num, data_dir)
+    delta_ts = list(delta_ts)
+    results = {}
+    for day in days:
+        day_data = load_day(round_num, day, data_dir)
+        for product in products if products is not None else day_data.products:
+            results[(product, day)] = lag_correlations(day_data.prices[product][column], max_j, delta_ts)
+    return results
+
+
+def plot_lag_correlations(correlations: np.ndarray, delta_ts: Iterable[int] = DELTA_TS, skip_short_lags: bool = True, title: str = None, ax=None):
+    """One line per delta_t; skip_short_lags hides j < delta_t, where the two windows overlap."""
+    import matplotlib.pyplot as plt
+
+    if ax is None:
+        _, ax = plt.subplots(figsize=(12, 6))
+    js = np.arange(1, correlations.shape[1] + 1)
+    for row, delta_t in enumerate(delta_ts):
+        keep = js >= delta_t if skip_short_lags else slice(None)
+        ax.plot(js[keep], correlations[row][keep], linestyle='-', label=f'Δt = {delta_t}')
+    ax.set_title(title or 'Correlation between Δ[i] and Δ[i + j] (excluding j < Δt)')
+    ax.set_xlabel('j (lag)')
+    ax.set_ylabel('Correlation Coefficient')
+    ax.axhline(0, color='black', linestyle='--', linewidth=1)
+    ax.grid(True)
+    ax.legend(bbox_to_anchor=(1.05, 1), loc='upper left')
+    return ax
+
+
+if __name__ == "__main__":
+    for (product, day), correlations in day_lag_correlations().items():
+        strongest = np.nanargmax(np.abs(correlations[0]))
+        print(f"{product} day {day}: Δt=1 lag-1 corr {correlations[0, 0]:.3f}, strongest at j={strongest + 1} ({correlations[0, strongest]:.3f})")
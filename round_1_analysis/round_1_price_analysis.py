@@ -1,31 +1,23 @@
 import numpy as np
-import pandas as pd
 import matplotlib.pyplot as plt
 import statistics
+import os
+import sys
 
-all_prices_df=pd.read_csv("round_1_data/prices_round_1_day_-2.csv")
-
-ink_prices_df=all_prices_df[all_prices_df["product"]=="SQUID_INK"]
-
-ink_prices=list(ink_prices_df["bid_price_1"])
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from data_cache import load_day
+from delta_stats import BIN_EDGES, conditional_delta_stats
+from lag_correlation import DATA_DIR, lag_correlations, plot_lag_correlations
 
 
 
 import seaborn as sns
 
 def delta_heatmap_half_integer(data):
-    # First-order differences
-    deltas = np.diff(data)
-
-    # X = Δ[i], Y = Δ[i+1]
-    x = deltas[:-1]
-    y = deltas[1:]
-
-    # Define bin edges for half-integer steps from -5 to 5
-    bin_edges = np.arange(-5.25, 5.75, 0.5)  # Covers -5 to 5 with center bins
-
-    # Create 2D histogram
-    heatmap, xedges, yedges = np.histogram2d(x, y, bins=[bin_edges, bin_edges])
+    # Counts of Δ[i] (rows) vs Δ[i+1] (columns) in half-integer bins from -5 to 5
+    bin_edges = BIN_EDGES
+    heatmap = conditional_delta_stats(data, bin_edges)["transitions"]
+    xedges = yedges = bin_edges
 
     # Plot heatmap
     plt.figure(figsize=(8, 6))
@@ -49,26 +41,11 @@ def delta_heatmap_half_integer(data):
 
 def conditional_mean_delta_with_error(data):
 
-    deltas = np.diff(data)
-    x = deltas[:-1]      # Δ[i]
-    y = deltas[1:]       # Δ[i+1]
-
-    # Define possible delta values: from -5.0 to 5.0 in 0.5 steps
-    delta_vals = np.arange(-5.0, 5.1, 0.5)
-    mean_next_delta = []
-    std_next_delta = []
-
-    for d in delta_vals:
-        # Select indices where Δ[i] ≈ d (using tolerance for float matching)
-        indices = np.where(np.isclose(x, d, atol=0.25))[0]
-        if len(indices) > 0:
-            mean = np.mean(y[indices])
-            std = np.std(y[indices])
-        else:
-            mean = np.nan
-            std = np.nan
-        mean_next_delta.append(mean)
-        std_next_delta.append(std)
+    # Mean and std of Δ[i+1] for each Δ[i] bucket from -5.0 to 5.0 in 0.5 steps (NaN where empty)
+    stats = conditional_delta_stats(data)
+    delta_vals = stats["centers"]
+    mean_next_delta = stats["mean"]
+    std_next_delta = stats["std"]
 
     # Plot
     plt.figure(figsize=(10, 6))
@@ -102,22 +79,7 @@ def first_difference_correlation(values, max_j=100, delta_t=1):
     - max_j: maximum lag to evaluate
     - delta_t: step size for computing deltas (e.g., 1st diff, 2nd diff, etc.)
     """
-    n = len(values)
-    correlations = []
-
-    for j in range(1, max_j + 1):
-        diffs_1 = []
-        diffs_2 = []
-        for i in range(n - j - delta_t):
-            diff1 = values[i + delta_t] - values[i]
-            diff2 = values[i + j + delta_t] - values[i + j]
-            diffs_1.append(diff1)
-            diffs_2.append(diff2)
-        if len(diffs_1) > 1:
-            corr = np.corrcoef(diffs_1, diffs_2)[0, 1]
-        else:
-            corr = np.nan
-        correlations.append(corr)
+    correlations = lag_correlations(values, max_j, [delta_t])[0].tolist()
 
     # Plot
     plt.figure(figsize=(10, 5))
@@ -143,43 +105,8 @@ def plot_multiple_delta_correlations(values, max_j=100, delta_ts=range(1, 21)):
     - max_j: maximum lag to evaluate
     - delta_ts: list of delta_t values to plot
     """
-    plt.figure(figsize=(12, 6))
-    
-    for delta_t in delta_ts:
-        correlations = []
-        valid_js = []  # To keep track of which j's we actually calculated
-        
-        for j in range(1, max_j + 1):
-            # Skip cases where j < delta_t
-            if j < delta_t:
-                continue
-                
-            diffs_1 = []
-            diffs_2 = []
-            for i in range(len(values) - j - delta_t):
-                diff1 = values[i + delta_t] - values[i]
-                diff2 = values[i + j + delta_t] - values[i + j]
-                diffs_1.append(diff1)
-                diffs_2.append(diff2)
-            
-            if len(diffs_1) > 1:
-                corr = np.corrcoef(diffs_1, diffs_2)[0, 1]
-            else:
-                corr = np.nan
-                
-            correlations.append(corr)
-            valid_js.append(j)
-        
-        # Plot only the valid j values for this delta_t
-        plt.plot(valid_js, correlations, marker='', linestyle='-', 
-                label=f'Δt = {delta_t}')
-    
-    plt.title('Correlation between Δ[i] and Δ[i + j] (excluding j < Δt)')
-    plt.xlabel('j (lag)')
-    plt.ylabel('Correlation Coefficient')
-    plt.axhline(0, color='black', linestyle='--', linewidth=1)
-    plt.grid(True)
-    plt.legend(bbox_to_anchor=(1.05, 1), loc='upper left')
+    correlations = lag_correlations(values, max_j, delta_ts)
+    plot_lag_correlations(correlations, delta_ts)
     plt.tight_layout()
     plt.show()
 # Example usage:
@@ -193,6 +120,8 @@ def delta_distribution(values):
     plt.show()
 
 
-data = ink_prices
-# Generate heatmap
-delta_distribution(data)
\ No newline at end of file
+if __name__ == "__main__":
+    ink_prices=load_day(1, -2, DATA_DIR).prices["SQUID_INK"]["bid_price_1"].tolist()
+    data = ink_prices
+    # Generate heatmap
+    delta_distribution(data)
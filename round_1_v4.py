@@ -3,7 +3,8 @@ from typing import List, Dict, Any
 import numpy as np
 import statistics as stat
 import math
-import jsonpickle # Make sure to import jsonpickle
+import json
+import copy
 
 
 
@@ -14,6 +15,50 @@ class Product: # Define Product constants if not already globally available
     KELP = "KELP"
     SQUID_INK = "SQUID_INK"
 
+class TraderStateCodec:
+    """ Versioned fixed-schema traderData: compact JSON [version, [scalars...]]. """
+
+    VERSION = 2
+
+    def __init__(self, scalar_fields: List[str]):
+        self.scalar_fields = list(scalar_fields)
+
+    def encode(self, state: Dict[str, Any]) -> str:
+        scalars = [state.get(name) for name in self.scalar_fields]
+        return json.dumps([self.VERSION, scalars], separators=(",", ":"))
+
+    def decode(self, data: str | None) -> Dict[str, Any]:
+        """ Never raises: unreadable, foreign or other-version data decodes to an empty state. """
+        state = {}
+        if not data:
+            return state
+        try:
+            payload = json.loads(data)
+        except ValueError:
+            return state
+        if isinstance(payload, dict):
+            # Plain dict traderData from before the codec: keep the fields we still know
+            for name in self.scalar_fields:
+                if self.is_number(payload.get(name)):
+                    state[name] = payload[name]
+            return state
+        if not isinstance(payload, list) or len(payload) != 2 or payload[0] != self.VERSION:
+            return state
+        scalars = payload[1]
+        if not isinstance(scalars, list) or len(scalars) != len(self.scalar_fields):
+            return state
+        if not all(value is None or self.is_number(value) for value in scalars):
+            return state
+        for name, value in zip(self.scalar_fields, scalars):
+            if value is not None:
+                state[name] = value
+        return state
+
+    @staticmethod
+    def is_number(value: Any) -> bool:
+        return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
 class Trader:
     """Main trading class implementing different strategies for different products."""
 
@@ -61,8 +106,55 @@ class Trader:
         }
     }
 
-    def __init__(self):
+    # traderData schema: scalars carried between ticks
+    STATE_SCALARS = [f"{Product.KELP}_last_price", f"{Product.SQUID_INK}_last_price"]
+
+    # Keys in a params file that describe a run rather than configure the strategy
+    NON_PARAM_KEYS = ("pnl",)
+
+    def __init__(self, params: Dict[str, Dict[str, Any]] | None = None, params_file: str | None = None):
+        """ params / params_file override PRODUCT_PARAMS per product (e.g. optimized_params.json). """
+        overrides = {}
+        if params_file is not None:
+            overrides = self.load_params_file(params_file)
+        if params:
+            for product, product_params in params.items():
+                overrides.setdefault(product, {}).update(product_params)
+        # Instance copy so overrides never leak into the class defaults or other Trader instances
+        self.PRODUCT_PARAMS = self.merge_params(self.PRODUCT_PARAMS, overrides)
         self.active_products = [Product.RAINFOREST_RESIN, Product.KELP, Product.SQUID_INK]
+        self.state_codec = TraderStateCodec(self.STATE_SCALARS)
+        # Last traderData we returned and the live object it encodes
+        self.last_trader_data = None
+        self.last_trader_object = None
+
+    @classmethod
+    def merge_params(cls, base: Dict[str, Dict[str, Any]], overrides: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """ Returns a deep copy of base with each product's overrides applied on top. """
+        merged = copy.deepcopy(base)
+        for product, product_params in overrides.items():
+            merged.setdefault(product, {}).update(
+                {key: value for key, value in product_params.items() if key not in cls.NON_PARAM_KEYS}
+            )
+        return merged
+
+    @staticmethod
+    def load_params_file(params_file: str) -> Dict[str, Dict[str, Any]]:
+        """ Reads per-product overrides from a JSON file; a missing file raises OSError, a malformed one ValueError. """
+        with open(params_file, "r") as f:
+            try:
+                loaded = json.load(f)
+            except ValueError as e:
+                raise ValueError(f"{params_file} is not valid JSON: {e}") from e
+        if not isinstance(loaded, dict) or not all(isinstance(values, dict) for values in loaded.values()):
+            raise ValueError(f"{params_file} must map each product to an object of params")
+        return {product: dict(values) for product, values in loaded.items()}
+
+    def load_trader_object(self, trader_data: str) -> Dict[str, Any]:
+        """ Reuses the live state when traderData is exactly what we returned last tick; decodes otherwise (e.g. after a restart). """
+        if self.last_trader_object is not None and (trader_data is self.last_trader_data or trader_data == self.last_trader_data):
+            return self.last_trader_object
+        return self.state_codec.decode(trader_data) # Falls back to an empty state on anything unreadable
 
     # --- Fair Value Calculation (Adapted from starfruit_fair_value) ---
     def calculate_dynamic_fair_value(self, symbol: str, order_depth: OrderDepth, traderObject: Dict) -> float | None:
@@ -332,17 +424,8 @@ class Trader:
         """ Main trading logic entry point. """
         result = {}
         conversions = 0 # Example conversion value, adjust as needed
-        traderObject = {} # Dictionary to store persistent state
 
-        # Decode traderData if it exists
-        if state.traderData is not None and state.traderData != "":
-            try:
-                traderObject = jsonpickle.decode(state.traderData)
-                if not isinstance(traderObject, dict): # Ensure it's a dict
-                    traderObject = {}
-            except Exception as e:
-                # print(f"Error decoding traderData: {e}") # Optional logging
-                traderObject = {} # Reset if decoding fails
+        traderObject = self.load_trader_object(state.traderData) # Dictionary to store persistent state
 
         for symbol in self.active_products:
             if symbol not in state.order_depths:
@@ -423,7 +506,9 @@ class Trader:
             result[symbol] = orders
 
         # Encode the updated state back into traderData
-        traderData = jsonpickle.encode(traderObject, unpicklable=False) # Make it simpler JSON if needed
+        traderData = self.state_codec.encode(traderObject)
+        self.last_trader_data = traderData
+        self.last_trader_object = traderObject
 
 
         return result, conversions, traderData
\ No newline at end of file
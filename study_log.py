@@ -0,0 +1,64 @@
+import json
+import os
+import time
+from typing import Any, Dict, List, Tuple
+
+# Configuration
+STUDY_FILE = "optimization_study.jsonl"
+
+
+class StudyLog:
+    """Append-only JSONL record of every evaluated point, so an interrupted optimization can resume."""
+
+    def __init__(self, trader_hash: str, data_hash: str, path: str = STUDY_FILE):
+        self.trader_hash = trader_hash
+        self.data_hash = data_hash
+        self.path = path
+
+    def append(self, product: str, params: Dict[str, Any], pnl: float) -> None:
+        record = {
+            "product": product,
+            "params": params,
+            "pnl": float(pnl),
+            "trader_hash": self.trader_hash,
+            "data_hash": self.data_hash,
+            "time": time.time(),
+        }
+        # One line per evaluation, flushed to disk before the optimizer moves on
+        with open(self.path, "a") as f:
+            f.write(json.dumps(record) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def records(self, product: str) -> List[Dict[str, Any]]:
+        """Points logged for this product against the same trader and data, oldest first."""
+        if not os.path.exists(self.path):
+            return []
+        records = []
+        with open(self.path) as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # A line cut short by a crash
+                if (
+                    record.get("product") == product
+                    and record.get("trader_hash") == self.trader_hash
+                    and record.get("data_hash") == self.data_hash
+                ):
+                    records.append(record)
+        return records
+
+    def warm_start(self, product: str, space) -> Tuple[List[List[Any]], List[float]]:
+        """x0/y0 for gp_minimize from the logged points that still fit the search space."""
+        x0, y0 = [], []
+        for record in self.records(product):
+            params = record["params"]
+            try:
+                point = [params[dim.name] for dim in space]
+            except KeyError:
+                continue
+            if all(point_value in dim for point_value, dim in zip(point, space)):
+                x0.append(point)
+                y0.append(-record["pnl"])
+        return x0, y0
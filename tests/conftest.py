@@ -0,0 +1,8 @@
+import os
+import sys
+
+# The modules under test live at the repo root, not in a package; make them importable
+# however pytest is invoked (plain `pytest`, `pytest tests`, or from inside tests/)
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
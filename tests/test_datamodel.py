@@ -0,0 +1,68 @@
+import json
+
+import pytest
+
+from datamodel import (
+    ArrayOrderDepth, CompactOrderDepth, CompactTrade, ConversionObservation, Listing, Observation, OrderDepth, Trade,
+    TradingState, object_fields, state_to_json,
+)
+
+
+def make_state(order_depth_class=OrderDepth) -> TradingState:
+    order_depth = order_depth_class()
+    order_depth.buy_orders = {10002: 0, 9996: 1, 9995: 22}
+    order_depth.sell_orders = {10004: -1, 10005: -22}
+    observations = Observation(
+        {"SQUID_INK": 3},
+        {"ORCHIDS": ConversionObservation(1100.5, 1102.0, 1.5, 9.5, -5.0, 2500.0, 75.0)},
+    )
+    return TradingState(
+        "[2,[2027.5,null]]",
+        536800,
+        {"RAINFOREST_RESIN": Listing("RAINFOREST_RESIN", "RAINFOREST_RESIN", "SEASHELLS")},
+        {"RAINFOREST_RESIN": order_depth},
+        {"RAINFOREST_RESIN": [Trade("RAINFOREST_RESIN", 9996, 1, "", "SUBMISSION", 536700)]},
+        {"RAINFOREST_RESIN": [Trade("RAINFOREST_RESIN", 10004, 2, "", "", 536700)]},
+        {"RAINFOREST_RESIN": -1},
+        observations,
+    )
+
+
+def test_to_json_matches_generic_encoding():
+    state = make_state()
+    assert state.toJSON() == json.dumps(state, default=object_fields, sort_keys=True)
+    # Array-backed books encode the same as dict ones
+    assert make_state(ArrayOrderDepth).toJSON() == state.toJSON()
+    unsorted = json.loads(state.toJSON(sort_keys=False))
+    assert list(unsorted) == list(vars(state))
+    assert unsorted == json.loads(state.toJSON())
+
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_from_json_round_trip(compact):
+    text = make_state().toJSON()
+    rebuilt = TradingState.from_json(text, compact=compact)
+
+    assert rebuilt.toJSON() == text
+    order_depth = rebuilt.order_depths["RAINFOREST_RESIN"]
+    assert isinstance(order_depth, CompactOrderDepth if compact else OrderDepth)
+    assert order_depth.buy_orders == {10002: 0, 9996: 1, 9995: 22}
+    assert order_depth.sell_orders == {10004: -1, 10005: -22}
+    assert all(isinstance(price, int) for price in order_depth.buy_orders)
+    trade = rebuilt.own_trades["RAINFOREST_RESIN"][0]
+    assert isinstance(trade, CompactTrade if compact else Trade)
+    assert (trade.price, trade.quantity, trade.seller) == (9996, 1, "SUBMISSION")
+    assert rebuilt.observations.conversionObservations["ORCHIDS"].humidity == 75.0
+    unsorted = make_state().toJSON(sort_keys=False)
+    assert state_to_json(TradingState.from_json(unsorted, compact=compact)) == unsorted
+
+
+def test_observation_str_matches_jsonpickle():
+    jsonpickle = pytest.importorskip("jsonpickle")
+    observations = make_state().observations
+    expected = (
+        "(plainValueObservations: " + jsonpickle.encode(observations.plainValueObservations)
+        + ", conversionObservations: " + jsonpickle.encode(observations.conversionObservations) + ")"
+    )
+    assert str(observations) == expected
+    assert str(Observation({}, {})) == "(plainValueObservations: {}, conversionObservations: {})"
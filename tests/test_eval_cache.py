@@ -0,0 +1,13 @@
+from eval_cache import canonicalize_params
+
+RESIN = {"fair_value": 10000}
+
+
+def test_whole_number_widths_share_keys_with_equivalent_widths():
+    assert canonicalize_params({"clear_width": 3.0}, RESIN) == canonicalize_params({"clear_width": 2.6}, RESIN)
+    assert canonicalize_params({"take_width": 2.0}, RESIN) == canonicalize_params({"take_width": 1.2}, RESIN)
+    assert canonicalize_params({"take_width": 2.0}, RESIN) != canonicalize_params({"take_width": 2.1}, RESIN)
+
+
+def test_widths_without_a_static_fair_value_are_rounded():
+    assert canonicalize_params({"take_width": 2.0, "reversion_beta": -0.150001}, {}) == {"take_width": 2, "reversion_beta": -0.15}
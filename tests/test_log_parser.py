@@ -0,0 +1,59 @@
+import contextlib
+import io
+import os
+
+import numpy as np
+
+from data_cache import PRICE_COLUMNS, parse_day_csv
+from datamodel import Listing, Observation, OrderDepth, TradingState
+from log_parser import LogParser
+from logger import Logger
+from order_matching import build_book_levels
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "round_1_data")
+PRODUCT = "RAINFOREST_RESIN"
+
+
+def flush_line(logger: Logger, timestamp: int, order_depth: OrderDepth) -> str:
+    listings = {PRODUCT: Listing(PRODUCT, PRODUCT, "SEASHELLS")}
+    state = TradingState("", timestamp, listings, {PRODUCT: order_depth}, {}, {}, {}, Observation({}, {}))
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        logger.flush(state, {}, 0, "")
+    return out.getvalue().strip()
+
+
+def test_zero_volume_level_matches_csv():
+    # Day -2, timestamp 676500: best bid 10002 with volume 0, then two ticks that keep the same book
+    columns = parse_day_csv(1, -2, DATA_DIR).prices[PRODUCT]
+    row = int((columns["timestamp"] == 676500).nonzero()[0][0])
+    book = build_book_levels(columns)[row]
+    order_depth = OrderDepth()
+    order_depth.buy_orders = book.buy_orders()
+    order_depth.sell_orders = book.sell_orders()
+    assert order_depth.buy_orders[10002] == 0
+
+    for delta_depths in (False, True):
+        logger = Logger(delta_depths=delta_depths, keyframe_every=2)
+        parser = LogParser()
+        for tick in range(3):  # Keyframe, delta tick, keyframe
+            assert parser.feed(flush_line(logger, 676500 + tick, order_depth))
+
+        parsed = parser.result.books[PRODUCT].to_numpy()
+        for column in PRICE_COLUMNS:
+            if column == "timestamp":
+                continue
+            np.testing.assert_array_equal(parsed[column], np.repeat(columns[column][row], 3), err_msg=column)
+
+
+def test_lines_of_another_shape_are_rejected():
+    parser = LogParser()
+    good = flush_line(Logger(), 100, OrderDepth())
+    for line in ("[]", "{}", "[[1,2],3]", '[[0,"",[],{},[],[],{},[]],[],0,"",""', "[1,2,3,4,5]",
+                 '[[0,"",[],{"KELP":[1,2]},[],[],{},[]],[],0,"",""]',
+                 '[[0,"",[],{},[[1]],[],{},[]],[],0,"",""]',
+                 '[[0,"",[],{},[],[],{},[]],[["KELP",1]],0,"",""]'):
+        assert not parser.feed(line), line
+    assert len(parser.result.ticks) == 0
+    assert parser.feed(good)
+    assert len(parser.result.ticks) == 1
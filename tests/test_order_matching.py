@@ -0,0 +1,33 @@
+import os
+
+from data_cache import parse_day_csv
+from datamodel import Order
+from order_matching import SUBMISSION, BookLevels, OrderMatcher, apply_fills, build_book_levels
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "round_1_data")
+
+
+def test_zero_volume_level_is_skipped():
+    book = BookLevels([10002, 9996, 9995], [0, 1, 22], [10004, 10005], [1, 22])
+    matcher = OrderMatcher({"RAINFOREST_RESIN": 50}, match_market_trades=False)
+
+    fills = matcher.match("RAINFOREST_RESIN", [Order("RAINFOREST_RESIN", 9995, -5)], book, 0, [], 100)
+
+    assert [(fill.price, fill.quantity) for fill in fills] == [(9996, 1), (9995, 4)]
+    assert all(fill.quantity > 0 for fill in fills)
+    assert apply_fills(fills, 0, 0.0) == (-5, 9996 * 1 + 9995 * 4)
+
+
+def test_zero_volume_level_from_csv():
+    # Day -2, timestamp 536800: RAINFOREST_RESIN's best bid is 10002 with volume 0
+    columns = parse_day_csv(1, -2, DATA_DIR).prices["RAINFOREST_RESIN"]
+    row = int((columns["timestamp"] == 536800).nonzero()[0][0])
+    book = build_book_levels(columns)[row]
+    assert book.bid_prices[0] == 10002 and book.bid_volumes[0] == 0
+
+    matcher = OrderMatcher({"RAINFOREST_RESIN": 50}, match_market_trades=False)
+    fills = matcher.match("RAINFOREST_RESIN", [Order("RAINFOREST_RESIN", 10002, -3)], book, 0, [], 536800)
+    assert fills == []
+
+    fills = matcher.match("RAINFOREST_RESIN", [Order("RAINFOREST_RESIN", 9996, -3)], book, 0, [], 536800)
+    assert [(fill.price, fill.quantity, fill.seller) for fill in fills] == [(9996, 1, SUBMISSION)]
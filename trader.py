@@ -3,7 +3,9 @@ from typing import List, Dict, Any
 import numpy as np
 import statistics as stat
 import math
-import jsonpickle # Make sure to import jsonpickle
+import json
+import bisect
+import copy
 
 # Assuming Logger is defined elsewhere or removing its usage for brevity
 from logger import Logger
@@ -15,6 +17,104 @@ class Product: # Define Product constants if not already globally available
     KELP = "KELP"
     SQUID_INK = "SQUID_INK"
 
+class TraderStateCodec:
+    """ Versioned fixed-schema traderData: compact JSON [version, [scalars...]]. """
+
+    VERSION = 2
+
+    def __init__(self, scalar_fields: List[str]):
+        self.scalar_fields = list(scalar_fields)
+
+    def encode(self, state: Dict[str, Any]) -> str:
+        scalars = [state.get(name) for name in self.scalar_fields]
+        return json.dumps([self.VERSION, scalars], separators=(",", ":"))
+
+    def decode(self, data: str | None) -> Dict[str, Any]:
+        """ Never raises: unreadable, foreign or other-version data decodes to an empty state. """
+        state = {}
+        if not data:
+            return state
+        try:
+            payload = json.loads(data)
+        except ValueError:
+            return state
+        if isinstance(payload, dict):
+            # Plain dict traderData from before the codec: keep the fields we still know
+            for name in self.scalar_fields:
+                if self.is_number(payload.get(name)):
+                    state[name] = payload[name]
+            return state
+        if not isinstance(payload, list) or len(payload) != 2 or payload[0] != self.VERSION:
+            return state
+        scalars = payload[1]
+        if not isinstance(scalars, list) or len(scalars) != len(self.scalar_fields):
+            return state
+        if not all(value is None or self.is_number(value) for value in scalars):
+            return state
+        for name, value in zip(self.scalar_fields, scalars):
+            if value is not None:
+                state[name] = value
+        return state
+
+    @staticmethod
+    def is_number(value: Any) -> bool:
+        return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+class BookView:
+    """ One tick's OrderDepth for one symbol, sorted once so every strategy stage reads it without rescanning. """
+
+    def __init__(self, order_depth: OrderDepth):
+        self.order_depth = order_depth
+        # Both sides ascending by price; volumes are positive sizes
+        self.bid_prices = sorted(order_depth.buy_orders)
+        self.bid_volumes = [abs(order_depth.buy_orders[price]) for price in self.bid_prices]
+        self.ask_prices = sorted(order_depth.sell_orders)
+        self.ask_volumes = [abs(order_depth.sell_orders[price]) for price in self.ask_prices]
+
+        self.best_bid = self.bid_prices[-1] if self.bid_prices else None
+        self.best_ask = self.ask_prices[0] if self.ask_prices else None
+        self.best_bid_volume = order_depth.buy_orders[self.best_bid] if self.bid_prices else 0 # As in OrderDepth (positive)
+        self.best_ask_volume = order_depth.sell_orders[self.best_ask] if self.ask_prices else 0 # As in OrderDepth (negative)
+
+        # bid_volume_from[i]: bid size at bid_prices[i] and above; ask_volume_to[i]: ask size at ask_prices[i] and below
+        self.bid_volume_from = [0] * (len(self.bid_prices) + 1)
+        for i in range(len(self.bid_prices) - 1, -1, -1):
+            self.bid_volume_from[i] = self.bid_volume_from[i + 1] + self.bid_volumes[i]
+        self.ask_volume_to = [0]
+        for volume in self.ask_volumes:
+            self.ask_volume_to.append(self.ask_volume_to[-1] + volume)
+
+        self._filtered = {}
+
+    def has_both_sides(self) -> bool:
+        return bool(self.bid_prices) and bool(self.ask_prices)
+
+    def filtered_best(self, min_volume: float) -> tuple:
+        """ (best bid, best ask) among levels with at least min_volume, None where no level qualifies. """
+        if min_volume not in self._filtered:
+            mm_bid = next((price for price, volume in zip(reversed(self.bid_prices), reversed(self.bid_volumes)) if volume >= min_volume), None)
+            mm_ask = next((price for price, volume in zip(self.ask_prices, self.ask_volumes) if volume >= min_volume), None)
+            self._filtered[min_volume] = (mm_bid, mm_ask)
+        return self._filtered[min_volume]
+
+    def bid_volume_at_or_above(self, price: float) -> int:
+        return self.bid_volume_from[bisect.bisect_left(self.bid_prices, price)]
+
+    def ask_volume_at_or_below(self, price: float) -> int:
+        return self.ask_volume_to[bisect.bisect_right(self.ask_prices, price)]
+
+    def best_bid_below(self, price: float) -> int | None:
+        """ Highest bid strictly below price. """
+        i = bisect.bisect_left(self.bid_prices, price)
+        return self.bid_prices[i - 1] if i > 0 else None
+
+    def best_ask_above(self, price: float) -> int | None:
+        """ Lowest ask strictly above price. """
+        i = bisect.bisect_right(self.ask_prices, price)
+        return self.ask_prices[i] if i < len(self.ask_prices) else None
+
+
 class Trader:
     """Main trading class implementing different strategies for different products."""
 
@@ -62,12 +162,59 @@ class Trader:
         }
     }
 
-    def __init__(self):
+    # traderData schema: scalars carried between ticks
+    STATE_SCALARS = [f"{Product.KELP}_last_price", f"{Product.SQUID_INK}_last_price"]
+
+    # Keys in a params file that describe a run rather than configure the strategy
+    NON_PARAM_KEYS = ("pnl",)
+
+    def __init__(self, params: Dict[str, Dict[str, Any]] | None = None, params_file: str | None = None):
+        """ params / params_file override PRODUCT_PARAMS per product (e.g. optimized_params.json). """
+        overrides = {}
+        if params_file is not None:
+            overrides = self.load_params_file(params_file)
+        if params:
+            for product, product_params in params.items():
+                overrides.setdefault(product, {}).update(product_params)
+        # Instance copy so overrides never leak into the class defaults or other Trader instances
+        self.PRODUCT_PARAMS = self.merge_params(self.PRODUCT_PARAMS, overrides)
         self.active_products = [Product.RAINFOREST_RESIN, Product.KELP, Product.SQUID_INK]
+        self.state_codec = TraderStateCodec(self.STATE_SCALARS)
+        # Last traderData we returned and the live object it encodes
+        self.last_trader_data = None
+        self.last_trader_object = None
         self.logger=Logger() # Assuming Logger class exists
 
+    @classmethod
+    def merge_params(cls, base: Dict[str, Dict[str, Any]], overrides: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """ Returns a deep copy of base with each product's overrides applied on top. """
+        merged = copy.deepcopy(base)
+        for product, product_params in overrides.items():
+            merged.setdefault(product, {}).update(
+                {key: value for key, value in product_params.items() if key not in cls.NON_PARAM_KEYS}
+            )
+        return merged
+
+    @staticmethod
+    def load_params_file(params_file: str) -> Dict[str, Dict[str, Any]]:
+        """ Reads per-product overrides from a JSON file; a missing file raises OSError, a malformed one ValueError. """
+        with open(params_file, "r") as f:
+            try:
+                loaded = json.load(f)
+            except ValueError as e:
+                raise ValueError(f"{params_file} is not valid JSON: {e}") from e
+        if not isinstance(loaded, dict) or not all(isinstance(values, dict) for values in loaded.values()):
+            raise ValueError(f"{params_file} must map each product to an object of params")
+        return {product: dict(values) for product, values in loaded.items()}
+
+    def load_trader_object(self, trader_data: str) -> Dict[str, Any]:
+        """ Reuses the live state when traderData is exactly what we returned last tick; decodes otherwise (e.g. after a restart). """
+        if self.last_trader_object is not None and (trader_data is self.last_trader_data or trader_data == self.last_trader_data):
+            return self.last_trader_object
+        return self.state_codec.decode(trader_data) # Falls back to an empty state on anything unreadable
+
     # --- Fair Value Calculation (Adapted from starfruit_fair_value) ---
-    def calculate_dynamic_fair_value(self, symbol: str, order_depth: OrderDepth, traderObject: Dict) -> float | None:
+    def calculate_dynamic_fair_value(self, symbol: str, book: BookView, traderObject: Dict) -> float | None:
         """ Calculates fair value based on filtered order book and mean reversion. """
         # Ensure the product has the necessary parameters defined
         if symbol not in self.PRODUCT_PARAMS or \
@@ -79,24 +226,14 @@ class Trader:
         params = self.PRODUCT_PARAMS[symbol]
         state_key = f"{symbol}_last_price" # Key for storing last price in traderObject
 
-        if len(order_depth.sell_orders) == 0 or len(order_depth.buy_orders) == 0:
+        if not book.has_both_sides():
             return None # Not enough data
 
-        best_ask = min(order_depth.sell_orders.keys())
-        best_bid = max(order_depth.buy_orders.keys())
-
-        # Filter orders by adverse_volume threshold
-        filtered_ask = [
-            price for price, volume in order_depth.sell_orders.items()
-            if abs(volume) >= params["adverse_volume"]
-        ]
-        filtered_bid = [
-            price for price, volume in order_depth.buy_orders.items()
-            if abs(volume) >= params["adverse_volume"]
-        ]
+        best_ask = book.best_ask
+        best_bid = book.best_bid
 
-        mm_ask = min(filtered_ask) if filtered_ask else None
-        mm_bid = max(filtered_bid) if filtered_bid else None
+        # Best levels among orders of at least adverse_volume
+        mm_bid, mm_ask = book.filtered_best(params["adverse_volume"])
 
         mmmid_price = None
         # Calculate Market Maker Mid-Price (mmmid_price)
@@ -137,7 +274,7 @@ class Trader:
         fair_value: float,
         take_width: float,
         orders: List[Order],
-        order_depth: OrderDepth,
+        book: BookView,
         position: int,
         buy_order_volume: int,
         sell_order_volume: int,
@@ -148,9 +285,9 @@ class Trader:
         position_limit = self.PRODUCT_PARAMS[product]["limit"]
 
         # Take profitable asks (Buy)
-        if order_depth.sell_orders:
-            best_ask = min(order_depth.sell_orders.keys())
-            best_ask_volume = order_depth.sell_orders[best_ask] # Typically negative
+        if book.best_ask is not None:
+            best_ask = book.best_ask
+            best_ask_volume = book.best_ask_volume # Typically negative
 
             # Check if we should avoid this trade due to large volume (adverse selection)
             should_trade_ask = not prevent_adverse or abs(best_ask_volume) <= adverse_volume
@@ -166,9 +303,9 @@ class Trader:
                     # For Prosperity, just placing the order is sufficient.
 
         # Take profitable bids (Sell)
-        if order_depth.buy_orders:
-            best_bid = max(order_depth.buy_orders.keys())
-            best_bid_volume = order_depth.buy_orders[best_bid] # Typically positive
+        if book.best_bid is not None:
+            best_bid = book.best_bid
+            best_bid_volume = book.best_bid_volume # Typically positive
 
             # Check if we should avoid this trade due to large volume (adverse selection)
             should_trade_bid = not prevent_adverse or abs(best_bid_volume) <= adverse_volume
@@ -189,7 +326,7 @@ class Trader:
         fair_value: float,
         clear_width: float, # Can be float now
         orders: List[Order],
-        order_depth: OrderDepth,
+        book: BookView,
         position: int,
         buy_order_volume: int,  # Volume already committed to buying this step
         sell_order_volume: int, # Volume already committed to selling this step
@@ -206,7 +343,7 @@ class Trader:
         if position_after_take > 0 and sell_remaining_capacity > 0:
             target_ask_price = round(fair_value + clear_width) # Price to sell at
             # How much volume exists at or better (higher) than our target price?
-            available_bid_volume = sum(vol for price, vol in order_depth.buy_orders.items() if price >= target_ask_price)
+            available_bid_volume = book.bid_volume_at_or_above(target_ask_price)
             # We sell the minimum of: what we need to clear, what capacity we have left, what the market offers
             quantity_to_clear = min(position_after_take, sell_remaining_capacity, available_bid_volume)
             if quantity_to_clear > 0:
@@ -217,7 +354,7 @@ class Trader:
         elif position_after_take < 0 and buy_remaining_capacity > 0:
             target_bid_price = round(fair_value - clear_width) # Price to buy at
             # How much volume exists at or better (lower) than our target price?
-            available_ask_volume = sum(abs(vol) for price, vol in order_depth.sell_orders.items() if price <= target_bid_price)
+            available_ask_volume = book.ask_volume_at_or_below(target_bid_price)
              # We buy the minimum of: what we need to clear, what capacity we have left, what the market offers
             quantity_to_clear = min(abs(position_after_take), buy_remaining_capacity, available_ask_volume)
             if quantity_to_clear > 0:
@@ -257,7 +394,7 @@ class Trader:
     def make_orders(
         self,
         product: str,
-        order_depth: OrderDepth,
+        book: BookView,
         fair_value: float,
         position: int,
         buy_order_volume: int,  # Volume from takes/clears
@@ -273,17 +410,8 @@ class Trader:
         soft_position_limit = params.get("soft_position_limit", 0)
 
         # Find relevant existing orders to potentially penny or join
-        asks_above_fair = [
-            price for price in order_depth.sell_orders.keys()
-            if price > fair_value + disregard_edge
-        ]
-        bids_below_fair = [
-            price for price in order_depth.buy_orders.keys()
-            if price < fair_value - disregard_edge
-        ]
-
-        best_ask_above_fair = min(asks_above_fair) if asks_above_fair else None
-        best_bid_below_fair = max(bids_below_fair) if bids_below_fair else None
+        best_ask_above_fair = book.best_ask_above(fair_value + disregard_edge)
+        best_bid_below_fair = book.best_bid_below(fair_value - disregard_edge)
 
         # Determine Ask Price
         ask_price = round(fair_value + default_edge)
@@ -334,23 +462,14 @@ class Trader:
         """ Main trading logic entry point. """
         result = {}
         conversions = 0 # Example conversion value, adjust as needed
-        traderObject = {} # Dictionary to store persistent state
 
-        # Decode traderData if it exists
-        if state.traderData is not None and state.traderData != "":
-            try:
-                traderObject = jsonpickle.decode(state.traderData)
-                if not isinstance(traderObject, dict): # Ensure it's a dict
-                    traderObject = {}
-            except Exception as e:
-                # print(f"Error decoding traderData: {e}") # Optional logging
-                traderObject = {} # Reset if decoding fails
+        traderObject = self.load_trader_object(state.traderData) # Dictionary to store persistent state
 
         for symbol in self.active_products:
             if symbol not in state.order_depths:
                 continue # Skip if no market data for this product
 
-            order_depth = state.order_depths[symbol]
+            book = BookView(state.order_depths[symbol]) # Sorted once, shared by every stage below
             orders: List[Order] = []
             position = state.position.get(symbol, 0)
             params = self.PRODUCT_PARAMS.get(symbol, {})
@@ -372,18 +491,18 @@ class Trader:
 
                 # 1. Take Orders
                 buy_volume_this_step, sell_volume_this_step = self.take_best_orders(
-                     symbol, fair_value, params["take_width"], orders, order_depth, position,
+                     symbol, fair_value, params["take_width"], orders, book, position,
                      buy_volume_this_step, sell_volume_this_step,
                      params.get("prevent_adverse", False), params.get("adverse_volume", 0) # Add adverse params if needed for Resin
                 )
                 # 2. Clear Orders
                 buy_volume_this_step, sell_volume_this_step = self.clear_position_order(
-                    symbol, fair_value, params["clear_width"], orders, order_depth, position,
+                    symbol, fair_value, params["clear_width"], orders, book, position,
                     buy_volume_this_step, sell_volume_this_step
                 )
                 # 3. Make Orders
                 make_orders_list, _, _ = self.make_orders( # Buy/Sell volume already tracked
-                    symbol, order_depth, fair_value, position,
+                    symbol, book, fair_value, position,
                     buy_volume_this_step, sell_volume_this_step,
                     params # Pass all Resin params
                 )
@@ -392,7 +511,7 @@ class Trader:
 
             elif symbol == Product.KELP or symbol == Product.SQUID_INK:
                 # Use dynamic fair value calculation and take/clear/make strategy
-                fair_value = self.calculate_dynamic_fair_value(symbol, order_depth, traderObject)
+                fair_value = self.calculate_dynamic_fair_value(symbol, book, traderObject)
 
                 if fair_value is None:
                     # print(f"Could not calculate fair value for {symbol}, skipping trades.") # Optional logging
@@ -401,18 +520,18 @@ class Trader:
 
                 # 1. Take Orders
                 buy_volume_this_step, sell_volume_this_step = self.take_best_orders(
-                    symbol, fair_value, params["take_width"], orders, order_depth, position,
+                    symbol, fair_value, params["take_width"], orders, book, position,
                     buy_volume_this_step, sell_volume_this_step,
                     params["prevent_adverse"], params["adverse_volume"]
                 )
                 # 2. Clear Orders
                 buy_volume_this_step, sell_volume_this_step = self.clear_position_order(
-                    symbol, fair_value, params["clear_width"], orders, order_depth, position,
+                    symbol, fair_value, params["clear_width"], orders, book, position,
                     buy_volume_this_step, sell_volume_this_step
                 )
                 # 3. Make Orders
                 make_orders_list, _, _ = self.make_orders( # Buy/Sell volume already tracked
-                    symbol, order_depth, fair_value, position,
+                    symbol, book, fair_value, position,
                     buy_volume_this_step, sell_volume_this_step,
                     params # Pass all params for KELP/INK
                 )
@@ -425,7 +544,9 @@ class Trader:
             result[symbol] = orders
 
         # Encode the updated state back into traderData
-        traderData = jsonpickle.encode(traderObject, unpicklable=False) # Make it simpler JSON if needed
+        traderData = self.state_codec.encode(traderObject)
+        self.last_trader_data = traderData
+        self.last_trader_object = traderObject
 
         self.logger.flush(state, result, conversions, traderData) # If using logger
 
@@ -1,19 +1,24 @@
-import subprocess
 import json
-import os
+import math
+import time
+from concurrent.futures import FIRST_COMPLETED, wait
 import numpy as np
-from skopt import gp_minimize
+from skopt import Optimizer
 from skopt.space import Real, Integer
-from skopt.utils import use_named_args
-import tempfile
-import shutil
-import re
+
+from backtester import load_trader_class
+from data_cache import data_hash
+from eval_cache import ENGINE_FILES, EvalCache, canonicalize_params, source_hash
+from study_log import StudyLog
+from parallel_backtest import BacktestJob, ParallelBacktester
 
 # Configuration
 TRADER_FILE = "trader.py"
-ROUNDS_TO_TEST = "1"
+ROUNDS_TO_TEST = 1
+DAYS_TO_TEST = [-2, -1, 0]
 PRODUCTS = ["RAINFOREST_RESIN", "KELP", "SQUID_INK"]
 MAX_EVALUATIONS = 50
+INITIAL_POINTS = 10
 PARALLEL_WORKERS = 4
 
 PARAM_SPACES = {
@@ -46,40 +51,22 @@ PARAM_SPACES = {
 
 class ParameterOptimizer:
     def __init__(self):
-        self.temp_dir = tempfile.mkdtemp()
         self.results = {}
-        self.original_code = self._load_trader_code()
-        self.original_params = self._extract_params()
-        
-    def __del__(self):
-        shutil.rmtree(self.temp_dir)
-
-    def _load_trader_code(self):
-        """Load the original trader code"""
-        with open(TRADER_FILE, 'r') as f:
-            return f.read()
-
-    def _extract_params(self):
-        """Extract PRODUCT_PARAMS using regex that handles class structure"""
-        pattern = r"class Trader:.*?PRODUCT_PARAMS = (\{.*?\})"
-        match = re.search(pattern, self.original_code, re.DOTALL)
-        
-        if not match:
-            raise ValueError("PRODUCT_PARAMS dictionary not found in Trader class")
-            
-        try:
-            # Create a minimal namespace with Product class mock
-            namespace = {
-                'Product': type('Product', (), {
-                    'RAINFOREST_RESIN': "RAINFOREST_RESIN",
-                    'KELP': "KELP",
-                    'SQUID_INK': "SQUID_INK"
-                })
-            }
-            exec(f"params = {match.group(1)}", namespace)
-            return namespace['params']
-        except Exception as e:
-            raise ValueError(f"Could not parse PRODUCT_PARAMS: {e}")
+        self.trader_class = load_trader_class(TRADER_FILE)
+        self.original_params = self.trader_class.PRODUCT_PARAMS
+        # Workers load and index every day once; each evaluation only replays it, with the
+        # fair value series precomputed per (adverse_volume, reversion_beta) instead of per tick
+        self.pool = ParallelBacktester(ROUNDS_TO_TEST, DAYS_TO_TEST, PARALLEL_WORKERS, precompute_fair_values=True)
+        # Enough points in flight that every worker has a day to replay
+        self.points_in_flight = max(1, math.ceil(PARALLEL_WORKERS / len(DAYS_TO_TEST)))
+        trader_hash = source_hash([TRADER_FILE] + ENGINE_FILES)
+        round_data_hash = data_hash(ROUNDS_TO_TEST, DAYS_TO_TEST)
+        self.cache = EvalCache(trader_hash, round_data_hash)
+        self.study = StudyLog(trader_hash, round_data_hash)
+
+    def close(self):
+        self.pool.close()
+        self.cache.close()
 
     def optimize_product(self, product):
         print(f"\n=== Optimizing {product} ===")
@@ -87,74 +74,104 @@ class ParameterOptimizer:
         space = PARAM_SPACES[product]
         param_names = [dim.name for dim in space]
         
-        @use_named_args(space)
-        def objective(**params):
-            return -self._run_backtest_with_params(product, params)
-        
-        result = gp_minimize(
-            objective,
-            space,
-            n_calls=MAX_EVALUATIONS,
-            random_state=42,
-            n_jobs=PARALLEL_WORKERS
-        )
-        
-        best_params = {
-            k: float(v) if isinstance(v, np.floating) else int(v) if isinstance(v, np.integer) else v
-            for k, v in dict(zip(param_names, result.x)).items()
-        }
+        self.cache.reset_counters()
+        optimizer = Optimizer(space, base_estimator="GP", n_initial_points=INITIAL_POINTS, random_state=42)
+
+        # Pick up every point a previous (possibly interrupted) run already evaluated
+        x0, y0 = self.study.warm_start(product, space)
+        if x0:
+            optimizer.tell(x0, y0)
+        x_iters, func_vals = list(x0), list(y0)
+        budget = MAX_EVALUATIONS - len(x0)
+        if x0:
+            print(f"Resuming from {len(x0)} logged evaluations, {max(budget, 0)} to go")
+
+        def record(point, params, pnl, logged=False):
+            optimizer.tell(point, -pnl)
+            x_iters.append(point)
+            func_vals.append(-pnl)
+            # Cache hits were logged when first evaluated; logging them again would warm-start
+            # the next run with duplicate points. Failed runs must not be replayed on resume either
+            if not logged and pnl > -1e9:
+                self.study.append(product, params, pnl)
+
+        start = time.time()
+        in_flight = []  # (point, params, day futures)
+        while budget > 0 or in_flight:
+            # Keep the pool full: propose new points while earlier ones are still running
+            while budget > 0 and len(in_flight) < self.points_in_flight:
+                point = self._ask(optimizer, [pending[0] for pending in in_flight])
+                budget -= 1
+                params = self._to_python(dict(zip(param_names, point)))
+                pnl = self.cache.get(product, self.canonical(product, params))
+                if pnl is not None:
+                    record(point, params, pnl, logged=True)
+                    continue
+                # Products in trader.py do not share state, so only the one being tuned is replayed
+                futures = [
+                    self.pool.submit(BacktestJob(TRADER_FILE, day, {product: params}, product=product))
+                    for day in DAYS_TO_TEST
+                ]
+                in_flight.append((point, params, futures))
+
+            if not in_flight:
+                continue
+            wait([future for _, _, futures in in_flight for future in futures], return_when=FIRST_COMPLETED)
+
+            # Tell the optimizer about each point as soon as all of its days are in
+            still_running = []
+            for point, params, futures in in_flight:
+                if not all(future.done() for future in futures):
+                    still_running.append((point, params, futures))
+                    continue
+                pnl = self._collect(product, futures)
+                if pnl > -1e9:  # Failed runs are not worth remembering
+                    self.cache.put(product, self.canonical(product, params), pnl)
+                record(point, params, pnl)
+            in_flight = still_running
+
+        best = int(np.argmin(func_vals))
+        best_params = self._to_python(dict(zip(param_names, x_iters[best])))
         
         self.results[product] = {
             'best_params': best_params,
-            'best_pnl': float(-result.fun),
-            'history': [float(-val) for val in result.func_vals]
+            'best_pnl': float(-func_vals[best]),
+            'history': [float(-val) for val in func_vals]
         }
-        
-    def _run_backtest_with_params(self, product, params):
-        """Run backtest with modified parameters"""
+        evaluated = len(func_vals) - len(x0)
+        elapsed = time.time() - start
+        print(f"{evaluated} evaluations in {elapsed:.1f}s ({3600 * evaluated / max(elapsed, 1e-9):.0f}/hour)")
+        print(self.cache.report())
+
+    def canonical(self, product, params):
+        return canonicalize_params(params, self.original_params.get(product, {}))
+
+    @staticmethod
+    def _ask(optimizer, pending_points):
+        """Constant liar: pretend every pending point scored the best value so far, then ask"""
+        if not pending_points:
+            return optimizer.ask()
+        lie = min(optimizer.yi) if optimizer.yi else 0.0
+        liar = optimizer.copy(random_state=optimizer.rng.randint(0, np.iinfo(np.int32).max))
+        liar.tell(pending_points, [lie] * len(pending_points))
+        return liar.ask()
+
+    @staticmethod
+    def _collect(product, futures):
+        """Sum one product's PnL over the day jobs of a point"""
         try:
-            modified_code = self._generate_modified_code(product, params)
-            temp_file = os.path.join(self.temp_dir, f"temp_{product}.py")
-            
-            with open(temp_file, 'w') as f:
-                f.write(modified_code)
-            
-            cmd = [
-                "prosperity3bt",
-                temp_file,
-                ROUNDS_TO_TEST,
-                "--merge-pnl",
-                "--no-out"
-            ]
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            
-            return self._parse_pnl(result.stdout)
-        
+            return sum(future.result()[1].get(product, 0.0) for future in futures)
         except Exception as e:
             print(f"Error in backtest: {str(e)[:100]}...")
             return -1e9
 
-    def _generate_modified_code(self, product, params):
-        """Generate code with updated parameters while preserving class structure"""
-        new_params = json.loads(json.dumps(self.original_params))
-        new_params[product].update(params)
-        
-        # Convert to properly formatted string
-        params_str = json.dumps(new_params, indent=4)
-        params_str = params_str.replace('"', '')  # Remove quotes for class references
-        
-        # Replace using regex that maintains class structure
-        pattern = r"(class Trader:.*?PRODUCT_PARAMS = )\{.*?\}(.*?def __init__)"
-        replacement = f"\\1{params_str}\\2"
-        modified_code = re.sub(pattern, replacement, self.original_code, flags=re.DOTALL)
-        
-        return modified_code
-
-    def _parse_pnl(self, output):
-        for line in output.split('\n'):
-            if line.startswith("Final PnL:"):
-                return float(line.split(":")[1].strip())
-        return -1e9
+    @staticmethod
+    def _to_python(params):
+        """skopt hands back numpy scalars; keep params plain ints/floats"""
+        return {
+            k: float(v) if isinstance(v, np.floating) else int(v) if isinstance(v, np.integer) else v
+            for k, v in params.items()
+        }
 
     def save_results(self, filename="optimized_params.json"):
         simplified = {
@@ -188,6 +205,9 @@ def main():
     except KeyboardInterrupt:
         print("\nOptimization interrupted! Saving partial results...")
         optimizer.save_results("partial_optimized_params.json")
+        print(f"Every evaluated point is kept in {optimizer.study.path}; rerun to resume.")
+    finally:
+        optimizer.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file